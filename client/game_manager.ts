@@ -18,9 +18,10 @@ interface Snapshot {
     positions: Map<Id, Point>
 }
 
-const UPDATE_RATE = 1 / server.update_rate
+const SNAPSHOT_RATE = server.fixed_timestep ? server.snapshot_rate || server.update_rate : server.update_rate
+const UPDATE_RATE = 1 / SNAPSHOT_RATE
 const INTERP_RATIO = 1
-const MAX_SNAPSHOTS = server.update_rate
+const MAX_SNAPSHOTS = SNAPSHOT_RATE
 
 function lerp(a: number, b: number, t: number): number {
     return a + (b - a) * t
@@ -47,6 +48,8 @@ export default class GameManager {
     private socket: Socket
     private leaderboard: Leaderboard
     private snapshots: Snapshot[]
+    // spectators get a downsampled stream, so interpolate over the interval actually received
+    private snapshot_interval: number = UPDATE_RATE
 
     private split_debounce: number = 0
     private shoot_debounce: number = 0
@@ -63,7 +66,7 @@ export default class GameManager {
         this.clock = new SyncedClock()
         this.scene = new GameScene(world, viewport)
         this.input = new InputManager(viewport)
-        this.leaderboard = new Leaderboard(world,leaderboard_div)
+        this.leaderboard = new Leaderboard(socket, leaderboard_div)
         this.snapshots = []
         this.on_death = () => {}
 
@@ -84,6 +87,11 @@ export default class GameManager {
 
             clock.sync(server_time)
 
+            const last_snapshot = snapshots[snapshots.length - 1]
+            if (last_snapshot != undefined && server_time > last_snapshot.time) {
+                this.snapshot_interval = server_time - last_snapshot.time
+            }
+
             const snapshot: Snapshot = {
                 time: server_time,
                 positions: new Map()
@@ -153,8 +161,6 @@ export default class GameManager {
                 world.delete(entity)
                 entities_map.delete(id)
             }
-
-            this.leaderboard.refresh()
         })
     }
 
@@ -164,7 +170,8 @@ export default class GameManager {
         const snapshots = this.snapshots
 
         const server_time = clock.time()
-        const render_time = server_time - (UPDATE_RATE + (UPDATE_RATE * INTERP_RATIO))
+        const interval = this.snapshot_interval
+        const render_time = server_time - (interval + (interval * INTERP_RATIO))
 
         var after = snapshots[1]
         var before = snapshots[0]
@@ -1,71 +1,43 @@
-import { LocalPlayer, Mass, Player, Name } from "./components"
-import { Id, World } from "./libs/ecs"
+import { Socket } from "socket.io-client";
 
 const DEFAULT_NAME = "An unnamed cell"
-const LEADERBOARD_SIZE = 10
 
-interface Entry {
-    name: string,
-    score: number,
-    local_player: boolean,
-}
+// [name, session id, total mass], sorted by the server
+type LeaderboardEntry = [string | null, string | null, number]
 
 export default class Leaderboard {
     private div: HTMLDivElement
-    private world: World
+    private socket: Socket
 
-    constructor(world: World, div: HTMLDivElement) {
+    constructor(socket: Socket, div: HTMLDivElement) {
         this.div = div
-        this.world = world
-    }
-
-    refresh() {
-        const world = this.world
+        this.socket = socket
 
-        const score_map: Map<string, Entry> = new Map()
-        for (const [entity, name, mass, session] of world.query(Name, Mass, Player)) {
-            var entry: Entry | undefined = score_map.get(session)
-            if (entry == undefined) {
-                entry = {
-                    name: name,
-                    score: mass,
-                    local_player: world.has(entity, LocalPlayer)
-                }
-                score_map.set(session, entry)
-                continue
-            }
-
-            entry.score += mass
-        }
+        socket.on("leaderboard", (entries: LeaderboardEntry[]) => {
+            this.refresh(entries)
+        })
+    }
 
-        const entries: Entry[] = []
-        for (const entry of score_map.values()) {
-            entries.push(entry);
-        }
+    refresh(entries: LeaderboardEntry[]) {
+        const local_session = this.socket.id
 
-        entries.sort((a, b) => {
-            return b.score - a.score
-        })
-        
         var html = `<span class="title">Leaderboard</span>`
-        for (var index = 0; index < LEADERBOARD_SIZE; index++) {
-            const entry = entries[index]
-            if (entry == undefined) {
-                break
-            }
+        for (var index = 0; index < entries.length; index++) {
+            const [name, session_id] = entries[index]
+            const local_player = session_id == local_session
 
             html += "<br/>"
-            if (entry.local_player) {
+            if (local_player) {
                 html += `<span class="me">`
             }
 
-            html += `${index + 1}. ${entry.name}`
+            html += `${index + 1}. ${name || DEFAULT_NAME}`
 
-            if (entry.local_player) {
+            if (local_player) {
                 html += `</span>`
             }
         }
 
         this.div.innerHTML = html
     }
-}
\ No newline at end of file
+}
@@ -0,0 +1,244 @@
+import argparse
+import json
+import sys
+import tracemalloc
+from libs.ecs import World, Query, Id, tag, component
+from time import perf_counter
+from typing import Callable, Dict, List
+
+Position = component(tuple)
+Velocity = component(tuple)
+Mass = component(float)
+Marked = tag()
+
+# ten tags are enough to spread entities over 1024 archetypes
+SPREAD_TAGS = [tag() for _ in range(10)]
+
+Benchmark = Callable[[int], Callable[[], None]]
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+def benchmark(name: str):
+    def register(setup: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+def spawn(world: World, count: int, *components: Id) -> List[Id]:
+    entities = []
+    for _ in range(count):
+        entity = world.entity()
+        for component_id in components:
+            world.set(entity, component_id, (0.0, 0.0))
+        entities.append(entity)
+
+    return entities
+
+def spread(world: World, count: int, archetypes: int) -> List[Id]:
+    entities = spawn(world, count, Position)
+    for index, entity in enumerate(entities):
+        combination = index % archetypes
+        for bit, spread_tag in enumerate(SPREAD_TAGS):
+            if combination & (1 << bit):
+                world.add(entity, spread_tag)
+
+    return entities
+
+@benchmark("entity")
+def bench_entity(count: int):
+    world = World()
+
+    def run():
+        for _ in range(count):
+            world.entity()
+
+    return run
+
+@benchmark("set_in_place")
+def bench_set_in_place(count: int):
+    world = World()
+    entities = spawn(world, count, Position)
+
+    def run():
+        for entity in entities:
+            world.set(entity, Position, (1.0, 1.0))
+
+    return run
+
+@benchmark("set_with_move")
+def bench_set_with_move(count: int):
+    world = World()
+    entities = spawn(world, count, Position)
+
+    def run():
+        for entity in entities:
+            world.set(entity, Velocity, (1.0, 1.0))
+
+    return run
+
+@benchmark("add_tag")
+def bench_add_tag(count: int):
+    world = World()
+    entities = spawn(world, count, Position)
+
+    def run():
+        for entity in entities:
+            world.add(entity, Marked)
+
+    return run
+
+@benchmark("remove_tag")
+def bench_remove_tag(count: int):
+    world = World()
+    entities = spawn(world, count, Position)
+    for entity in entities:
+        world.add(entity, Marked)
+
+    def run():
+        for entity in entities:
+            world.remove(entity, Marked)
+
+    return run
+
+@benchmark("delete_swap_remove")
+def bench_delete(count: int):
+    world = World()
+    entities = spawn(world, count, Position, Velocity)
+
+    # deleting from the front forces a swap with the last row every time
+    def run():
+        for entity in entities:
+            world.delete(entity)
+
+    return run
+
+@benchmark("spawn_one_by_one")
+def bench_spawn_one_by_one(count: int):
+    world = World()
+
+    def run():
+        for _ in range(count):
+            entity = world.entity()
+            world.set(entity, Position, (0.0, 0.0))
+            world.set(entity, Mass, 1.0)
+            world.add(entity, Marked)
+
+    return run
+
+@benchmark("spawn_batch")
+def bench_spawn_batch(count: int):
+    world = World()
+    positions = [(0.0, 0.0)] * count
+    masses = [1.0] * count
+
+    def run():
+        world.spawn_batch([Position, Mass, Marked], positions, masses)
+
+    return run
+
+@benchmark("get")
+def bench_get(count: int):
+    world = World()
+    entities = spawn(world, count, Position)
+
+    def run():
+        for entity in entities:
+            world.get(entity, Position)
+
+    return run
+
+@benchmark("has")
+def bench_has(count: int):
+    world = World()
+    entities = spawn(world, count, Position)
+
+    def run():
+        for entity in entities:
+            world.has(entity, Position)
+
+    return run
+
+def bench_query(archetypes: int) -> Benchmark:
+    def setup(count: int):
+        world = World()
+        spread(world, max(count, archetypes), archetypes)
+
+        def run():
+            for _ in Query(world, Position):
+                pass
+
+        return run
+
+    return setup
+
+def bench_query_construction(archetypes: int) -> Benchmark:
+    def setup(count: int):
+        world = World()
+        spread(world, archetypes, archetypes)
+
+        def run():
+            for _ in range(count):
+                iter(Query(world, Position))
+
+        return run
+
+    return setup
+
+for archetype_count in (1, 10, 1000):
+    BENCHMARKS[f"query_iterate_{archetype_count}"] = bench_query(archetype_count)
+    BENCHMARKS[f"query_construct_{archetype_count}"] = bench_query_construction(archetype_count)
+
+def measure(setup: Benchmark, count: int, repeats: int) -> dict:
+    best = float("inf")
+    for _ in range(repeats):
+        run = setup(count)
+        start = perf_counter()
+        run()
+        best = min(best, perf_counter() - start)
+
+    run = setup(count)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    traced_before = tracemalloc.get_traced_memory()[0]
+
+    run()
+
+    traced_after, traced_peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+
+    return {
+        "ops": count,
+        "ops_per_second": count / best,
+        "seconds_per_op": best / count,
+        "blocks_per_op": blocks / count,
+        "retained_bytes_per_op": (traced_after - traced_before) / count,
+        "peak_bytes_per_op": (traced_peak - traced_before) / count,
+    }
+
+def main(args) -> int:
+    names = args.benchmark or list(BENCHMARKS)
+    results = {}
+
+    for name in names:
+        result = measure(BENCHMARKS[name], args.count, args.repeats)
+        results[name] = result
+        print(f"{name:24} {result['ops_per_second']:14,.0f} ops/s {result['blocks_per_op']:8.2f} blocks/op {result['peak_bytes_per_op']:10.1f} peak B/op")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=4)
+
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmark the ECS primitives")
+    parser.add_argument("--benchmark", action="append", choices=list(BENCHMARKS))
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", default="bench_ecs_output.json")
+
+    sys.exit(main(parser.parse_args()))
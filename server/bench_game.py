@@ -0,0 +1,181 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+from libs.config import Config
+from libs.ecs import World, Query
+from libs.profiler import Profiler, percentile
+from libs.vector import Vector, magnitude
+from game import GameInstance, Mass, Position, random_position, set_mass
+from statistics import mean
+from time import perf_counter
+from typing import Dict, List, NamedTuple
+
+config = Config.from_file(os.path.join(os.path.dirname(__file__), "../config.json"))
+
+class Scenario(NamedTuple):
+    bots: int
+    game_overrides: dict = {}
+    split_chance: float = 0.002
+    shoot_chance: float = 0.01
+    starting_mass: float = 0.0
+
+SCENARIOS: Dict[str, Scenario] = {
+    "early_game": Scenario(bots=20),
+    "heavy_splitting": Scenario(bots=16, split_chance=0.02, starting_mass=32),
+    "huge_players": Scenario(bots=10, starting_mass=40, shoot_chance=0.05),
+    "food_10k": Scenario(bots=50, game_overrides={"maximum_food": 10000}),
+}
+
+BOT_SPACING = 256
+
+class StubSocket():
+    async def emit(self, event: str, data=None, **_):
+        pass
+
+class BenchBot():
+    sid: str
+    target: tuple[float, float]
+
+    def __init__(self, index: int) -> None:
+        self.sid = f"bot-{index}"
+        self.target = (0.0, 0.0)
+
+def build_instance(scenario: Scenario, ticks: int) -> tuple[GameInstance, List[BenchBot]]:
+    game_config = config.game._replace(**scenario.game_overrides)
+    bench_config = config._replace(game=game_config)
+
+    game_instance = GameInstance(StubSocket(), World(), bench_config, profiler=Profiler(window_size=ticks))
+
+    bots = [BenchBot(index) for index in range(scenario.bots)]
+    for bot in bots:
+        game_instance.connect(bot.sid, None)
+        game_instance.respawn(bot.sid, bot.sid)
+
+    # everyone respawns in the middle, left there the first bot to eat would swallow the rest on tick 0.
+    # scattered bots keep their distance, so nobody starts out inside someone else
+    world = game_instance.world
+    placed: List[Vector] = []
+    for bot in bots:
+        parent = game_instance._entity_map[bot.sid]
+        for entity, _ in Query(world, Mass).with_ids(parent):
+            position = random_position(game_config)
+            while any(magnitude(position - other) < BOT_SPACING for other in placed):
+                position = random_position(game_config)
+
+            placed.append(position)
+            world.set(entity, Position, position)
+            if scenario.starting_mass > 0:
+                set_mass(world, entity, scenario.starting_mass)
+
+    return game_instance, bots
+
+def drive_bots(game_instance: GameInstance, bots: List[BenchBot], scenario: Scenario):
+    half_width = game_instance.game_config.width / 2
+    half_height = game_instance.game_config.height / 2
+
+    for bot in bots:
+        if random.random() < 0.02:
+            bot.target = (random.uniform(-half_width, half_width), random.uniform(-half_height, half_height))
+
+        game_instance.move(bot.sid, bot.target)
+
+        if random.random() < scenario.split_chance:
+            game_instance.split(bot.sid, bot.target)
+        if random.random() < scenario.shoot_chance:
+            game_instance.shoot(bot.sid, bot.target)
+
+async def run_scenario(name: str, scenario: Scenario, ticks: int, seed: int) -> dict:
+    random.seed(seed)
+    game_instance, bots = build_instance(scenario, ticks)
+    delta_time = 1 / config.server.update_rate
+
+    # collections are timed into the profiler like they are in the game loop
+    garbage_collector = game_instance.garbage_collector
+    garbage_collector.start()
+
+    start = perf_counter()
+    try:
+        for tick in range(ticks):
+            drive_bots(game_instance, bots, scenario)
+            game_instance.step(delta_time)
+            await game_instance.snapshot(tick * delta_time)
+    finally:
+        garbage_collector.stop()
+    elapsed = perf_counter() - start
+
+    systems = {}
+    for system, samples in game_instance.profiler.timings.items():
+        ordered = sorted(samples)
+        systems[system] = {
+            "mean": mean(ordered),
+            "p50": percentile(ordered, 0.5),
+            "p99": percentile(ordered, 0.99),
+            "total": sum(ordered),
+        }
+
+    return {
+        "ticks": ticks,
+        "seconds": elapsed,
+        "ticks_per_second": ticks / elapsed,
+        "entities": len(game_instance.world.entity_index.sparse),
+        "systems": systems,
+    }
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    regressed = False
+
+    for scenario, result in results.items():
+        baseline_result = baseline.get(scenario)
+        if baseline_result == None:
+            continue
+
+        print(f"{scenario}:")
+        for system, stats in result["systems"].items():
+            baseline_stats = baseline_result["systems"].get(system)
+            if baseline_stats == None or baseline_stats["mean"] == 0:
+                continue
+
+            ratio = stats["mean"] / baseline_stats["mean"]
+            marker = ""
+            if ratio > (1 + threshold):
+                marker = "  << regression"
+                regressed = True
+
+            print(f"  {system:24} {baseline_stats['mean'] * 1e6:10.1f} us -> {stats['mean'] * 1e6:10.1f} us  x{ratio:.2f}{marker}")
+
+    return regressed
+
+async def main(args) -> int:
+    names = args.scenario or list(SCENARIOS)
+    results = {}
+
+    for name in names:
+        results[name] = await run_scenario(name, SCENARIOS[name], args.ticks, args.seed)
+        print(f"{name}: {results[name]['ticks_per_second']:.1f} ticks/s, {results[name]['entities']} entities")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=4)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+        if compare(results, baseline, args.threshold):
+            return 1
+
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark game systems with in-process bots")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS))
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--baseline", help="results file from a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown before flagging a regression")
+
+    sys.exit(asyncio.run(main(parser.parse_args())))
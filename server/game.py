@@ -2,20 +2,83 @@ import socketio
 from libs.ecs import World, Id, Query, tag, component, Data
 import random
 import json
+import hashlib
+import tracemalloc
 import libs.vector as vector
-from libs.vector_map import VectorMap
+from libs.spatial_index import SpatialIndex
 from libs.config import Config, GameConfig
-from time import time
+from libs.timestep import FixedTimestep
+from libs.profiler import Profiler
+from libs.recorder import InputRecorder, RecordingHeader
+from libs.scheduler import Scheduler, system
+from libs.leaderboard import Leaderboard
+from libs.timer_wheel import TimerWheel
+from libs.gc_control import GarbageCollector
+from libs.overload import (
+    OverloadController, SHED_SNAPSHOT_RATE, SHED_FOOD_RESPAWN, SHED_ADMISSIONS, SHED_INTEREST_RADIUS, BANDWIDTH_STEPS
+)
+from libs.tracer import Tracer, NullTracer, create_tracer
+from math import floor
+from time import time, perf_counter
+from dataclasses import dataclass
 from asyncio import sleep
-from typing import Dict
+from typing import Callable, Dict, List
 
 Vector = vector.Vector
 SocketServer = socketio.AsyncServer
 
+@dataclass
+class OwnerStats():
+    cells: int = 0
+    mass: float = 0.0
+
+    min_x: float = 0.0
+    min_y: float = 0.0
+    max_x: float = 0.0
+    max_y: float = 0.0
+
+    centroid_x: float = 0.0
+    centroid_y: float = 0.0
+
+    def add_cell(self, mass: float, position: Vector, radius: float):
+        if self.cells == 0:
+            self.min_x, self.min_y = position.x - radius, position.y - radius
+            self.max_x, self.max_y = position.x + radius, position.y + radius
+            self.centroid_x, self.centroid_y = position.x, position.y
+        else:
+            self.min_x = min(self.min_x, position.x - radius)
+            self.min_y = min(self.min_y, position.y - radius)
+            self.max_x = max(self.max_x, position.x + radius)
+            self.max_y = max(self.max_y, position.y + radius)
+
+        self.cells += 1
+        self.mass += mass
+
+    def remove_cell(self, mass: float):
+        self.cells -= 1
+        self.mass -= mass
+
+        if self.cells <= 0:
+            self.cells = 0
+            self.mass = 0.0
+
+# eaten food and viruses only leave a deficit behind, respawn_globs refills it within
+# a per tick budget so a sweep through dense food doesn't pay for every respawn at once
+@dataclass
+class Respawns():
+    food_deficit: int = 0
+    virus_deficit: int = 0
+    # set while shedding load, the deficits keep growing until it's cleared
+    deferred: bool = False
+
 # singletons
-FoodVectorMap = component(VectorMap)
-VirusVectorMap = component(VectorMap)
+SpatialIndexSingleton = component(SpatialIndex)
+FoodPool = component(list)
 GameConfigSingleton = component(GameConfig)
+LeaderboardSingleton = component(Leaderboard)
+Timers = component(TimerWheel)
+GhostClaims = component(list)
+RespawnsSingleton = component(Respawns)
 
 # types
 Food = tag()
@@ -23,22 +86,38 @@ Virus = tag()
 Player = tag()
 Session = component(str)
 
+# copy of a glob another tile owns (see tiles.py), holds the owner's session id for player cells
+Ghost = component(str)
+
 # metadata
 Name = component(str)
 Parent = component(Id[None])
+Stats = component(OwnerStats)
 
 # gameplay
 EatsFood = tag()
 ShouldSplit = tag()
-MergeDebounce = component(float)
+# toggled on split cells, so it lives outside the archetype tables.
+# holds the timer tick it expires on
+MergeDebounce = component(int, sparse=True)
 
 # physics
 Mass = component(float)
 Position = component(Vector)
-Velocity = component(Vector)
+Velocity = component(Vector, sparse=True)
 MoveDirection = component(Vector)
+# derived from Mass, kept up to date by the world (see GameInstance.__init__)
+Radius = component(float)
+MaxSpeed = component(float)
 
 MOVE_SPEED_ACTUATION_RADIUS = 16
+SNAPSHOT_SIZE_SAMPLE_RATE = 10
+FOOD_POOL_SIZE = 256
+SPATIAL_CELL_SIZE = 64
+# snapshots go out every this many times as many steps while shedding snapshot rate
+OVERLOAD_SNAPSHOT_DIVISOR = 2
+# culled views snap outward to a grid this many cells per interest radius, so sessions near each other share one
+INTEREST_CELLS_PER_RADIUS = 2
 
 def map(x: float, inmin: float, inmax: float, outmin: float, outmax: float) -> float:
     return outmin + (x - inmin) * (outmax - outmin) / (inmax - inmin)
@@ -78,27 +157,134 @@ def can_eat_glob(position: Vector, radius: float, other_position: Vector, other_
     distance_to_other = vector.magnitude(vector_to_other)
     return (distance_to_other < (radius - other_radius))
 
-def create_glob(world: World, mass: float, position: Vector) -> Id:
-    glob = world.entity()
-    world.set(glob, Mass, mass)
-    world.set(glob, Position, position)
-    return glob
+def rank_owner(world: World, owner: Id, stats: OwnerStats):
+    leaderboard = assert_get(world, LeaderboardSingleton, LeaderboardSingleton)
+    if stats.cells > 0:
+        leaderboard.update(owner, stats.mass)
+    else:
+        leaderboard.remove(owner)
+
+def set_mass(world: World, entity: Id, mass: float):
+    parent = world.get(entity, Parent)
+    stats = world.get(parent, Stats) if parent != None else None
+    if stats != None:
+        stats.mass += mass - assert_get(world, entity, Mass)
+        world.set(entity, Mass, mass)
+        rank_owner(world, parent, stats)
+        return
 
-def spawn_food(world: World, config: GameConfig, vector_map: VectorMap) -> Id:
-    min_mass = config.food_mass[0]
-    max_mass = config.food_mass[1]
-    mass = min_mass + ((max_mass - min_mass) * random.random())
+    world.set(entity, Mass, mass)
+
+def delete_glob(world: World, entity: Id):
+    parent = world.get(entity, Parent)
+    stats = world.get(parent, Stats) if parent != None else None
+    if stats != None:
+        stats.remove_cell(assert_get(world, entity, Mass))
+        rank_owner(world, parent, stats)
+
+    world.delete(entity)
+
+def create_glob(world: World, mass: float, position: Vector) -> Id:
+    return world.spawn_batch([Mass, Position], [mass], [position])[0]
+
+def random_position(config: GameConfig) -> Vector:
+    spawn_area = config.spawn_area
+    if spawn_area != None:
+        min_x, min_y, max_x, max_y = spawn_area
+        return Vector(
+            random.randint(int(min_x), int(max_x) - 1),
+            random.randint(int(min_y), int(max_y) - 1)
+        )
 
     half_width = config.width // 2
     half_height = config.height // 2
-    position = Vector(
+    return Vector(
         random.randint(-half_width, half_width), 
         random.randint(-half_height, half_height)
     )
 
-    entity = create_glob(world, mass, position)
-    world.add(entity, Food)
-    vector_map.insert(entity, position)
+# the emptiest of `candidates` random positions, judged by the globs in and around its index cell
+def sparse_position(config: GameConfig, spatial_index: SpatialIndex, candidates: int) -> Vector:
+    position = random_position(config)
+    if candidates <= 1:
+        return position
+
+    cells = spatial_index.cells
+    best = neighbourhood_size(cells, spatial_index.key(position.x, position.y))
+    for _ in range(candidates - 1):
+        if best == 0:
+            break
+
+        other = random_position(config)
+        size = neighbourhood_size(cells, spatial_index.key(other.x, other.y))
+        if size < best:
+            position, best = other, size
+
+    return position
+
+def neighbourhood_size(cells: dict, key: tuple[int, int]) -> int:
+    x, y = key
+    size = 0
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            cell = cells.get((x + dx, y + dy))
+            if cell != None:
+                size += len(cell)
+
+    return size
+
+def random_food_mass(config: GameConfig) -> float:
+    min_mass = config.food_mass[0]
+    max_mass = config.food_mass[1]
+    return min_mass + ((max_mass - min_mass) * random.random())
+
+def spawn_food_batch(world: World, config: GameConfig, count: int, candidates: int = 1) -> List[Id]:
+    spatial_index = assert_get(world, SpatialIndexSingleton, SpatialIndexSingleton)
+
+    masses = []
+    positions = []
+    for _ in range(count):
+        masses.append(random_food_mass(config))
+        positions.append(sparse_position(config, spatial_index, candidates))
+
+    return world.spawn_batch([Mass, Position, Food], masses, positions)
+
+# ejected mass isn't part of maximum_food, it only goes back to the pool
+def consume_food(world: World, entity: Id):
+    if not world.has(entity, Velocity):
+        assert_get(world, RespawnsSingleton, RespawnsSingleton).food_deficit += 1
+
+    pool_food(world, entity)
+
+# ghosts can't be eaten here, the tile owning the real glob settles the claim
+# and credits the mass back to the eater
+def claim_ghost(world: World, eater: Id, eater_mass: float, ghost: Id):
+    claims = assert_get(world, GhostClaims, GhostClaims)
+    claims.append((eater, eater_mass, ghost))
+    world.delete(ghost)
+
+# dormant food has no position, so it drops out of every Mass, Position query
+def pool_food(world: World, entity: Id):
+    pool = assert_get(world, FoodPool, FoodPool)
+    if len(pool) >= FOOD_POOL_SIZE:
+        world.delete(entity)
+        return
+
+    world.remove(entity, Position)
+    pool.append(entity)
+
+def spawn_ejected_mass(world: World, mass: float, position: Vector, velocity: Vector) -> Id:
+    pool = assert_get(world, FoodPool, FoodPool)
+    if len(pool) > 0:
+        entity = world.recycle(pool.pop())
+        world.set(entity, Mass, mass)
+    else:
+        entity = world.entity()
+        world.set(entity, Mass, mass)
+        world.add(entity, Food)
+
+    world.set(entity, Position, position)
+    world.set(entity, Velocity, velocity)
 
     return entity
 
@@ -110,85 +296,119 @@ def spawn_player(world: World, parent: Id, mass: float, position: Vector) -> Id:
     world.set(glob, Parent, parent)
     world.set(glob, Velocity, Vector())
     world.set(glob, MoveDirection, Vector())
+
+    stats = world.get(parent, Stats)
+    if stats != None:
+        stats.add_cell(mass, position, assert_get(world, glob, Radius))
+        rank_owner(world, parent, stats)
+
     return glob
 
-def spawn_virus(world: World, config: GameConfig, vector_map: VectorMap) -> Id:
+# cells spawned together by a split, already carrying the components split cells get afterwards
+def spawn_player_batch(
+    world: World, parent: Id, masses: List[float], positions: List[Vector], 
+    velocities: List[Vector], move_directions: List[Vector], merge_debounce: float
+) -> List[Id]:
+    timers = assert_get(world, Timers, Timers)
+    deadline = timers.deadline(merge_debounce)
+    count = len(masses)
+
+    cells = world.spawn_batch(
+        [Mass, Position, Player, parent, EatsFood, Parent, Velocity, MoveDirection, MergeDebounce],
+        masses, positions, [parent] * count, velocities, move_directions, [deadline] * count
+    )
+
+    for cell in cells:
+        timers.schedule_at(deadline, expire_merge_debounce, world, cell, deadline)
+
+    stats = world.get(parent, Stats)
+    if stats != None and len(cells) > 0:
+        for cell, mass, position in zip(cells, masses, positions):
+            stats.add_cell(mass, position, assert_get(world, cell, Radius))
+        rank_owner(world, parent, stats)
+
+    return cells
+
+def spawn_virus(world: World, config: GameConfig, candidates: int = 1) -> Id:
     min_mass = config.virus_mass[0]
     max_mass = config.virus_mass[1]
     mass = min_mass + ((max_mass - min_mass) * random.random())  
-    
-    half_width = config.width // 2
-    half_height = config.height // 2
-    position = Vector(
-        random.randint(-half_width, half_width), 
-        random.randint(-half_height, half_height)
-    )
+    position = sparse_position(config, assert_get(world, SpatialIndexSingleton, SpatialIndexSingleton), candidates)
 
     virus = create_glob(world, mass, position)
     world.add(virus, Virus)
     world.add(virus, EatsFood)
-    vector_map.insert(virus, position)
 
     return virus
 
-def eat_food(world: World):
-    config = assert_get(world, GameConfigSingleton, GameConfigSingleton)
-    vector_map = assert_get(world, FoodVectorMap, FoodVectorMap)
+def eat_food(world: World, delta_time: float):
+    spatial_index = assert_get(world, SpatialIndexSingleton, SpatialIndexSingleton)
 
-    for entity, mass, position in Query(world, Mass, Position).with_ids(EatsFood):
-        radius = mass_to_radius(config, mass)
-        food_globs = vector_map.query_radius(position, radius)
+    for entity, mass, position, radius in Query(world, Mass, Position, Radius).with_ids(EatsFood):
+        food_globs = spatial_index.query_radius(position, radius, Food)
+        ate_food = False
 
         for food_entity in food_globs:
-            if (not world.contains(food_entity)):
+            food_position = world.get(food_entity, Position)
+            if (food_position == None):
                 continue
 
             food_mass = assert_get(world, food_entity, Mass)
-            food_position = assert_get(world, food_entity, Position)
-            food_radius = mass_to_radius(config, food_mass)
+            food_radius = assert_get(world, food_entity, Radius)
             
             if not can_eat_glob(position, radius, food_position, food_radius):
                 continue
 
-            mass += food_mass
+            if world.has(food_entity, Ghost):
+                claim_ghost(world, entity, mass, food_entity)
+                continue
 
-            is_player_drop = world.has(entity, Velocity)
-            vector_map.remove(food_entity, food_position)
-            world.delete(food_entity)
+            mass += food_mass
+            ate_food = True
+            consume_food(world, food_entity)
 
-            if not is_player_drop:
-                spawn_food(world, config, vector_map)
-            
-        world.set(entity, Mass, mass)
+        if ate_food:
+            set_mass(world, entity, mass)
 
 def eat_players(world: World, delta_time: float):
-    config = assert_get(world, GameConfigSingleton, GameConfigSingleton)
+    spatial_index = assert_get(world, SpatialIndexSingleton, SpatialIndexSingleton)
 
-    for entity, mass, position, parent in Query(world, Mass, Position, Parent):
-        radius = mass_to_radius(config, mass)
+    for entity, mass, position, radius, parent in Query(world, Mass, Position, Radius, Parent):
+        ate_player = False
 
-        for other_entity, other_mass, other_position in Query(world, Mass, Position).with_ids(Player):
+        for other_entity in spatial_index.query_radius(position, radius, Player):
             if other_entity == entity:
                 continue
 
-            if other_mass >= mass:
+            other_mass = world.get(other_entity, Mass)
+            if other_mass == None or other_mass >= mass:
                 continue
 
             if world.has(other_entity, parent, MergeDebounce):
                 continue
 
-            other_radius = mass_to_radius(config, other_mass)
+            other_position = assert_get(world, other_entity, Position)
+            other_radius = assert_get(world, other_entity, Radius)
             if not can_eat_glob(position, radius, other_position, other_radius):
                 continue
 
+            ghost_session = world.get(other_entity, Ghost)
+            if ghost_session != None:
+                # cells of one player only merge once they share a tile
+                if ghost_session != world.get(parent, Session):
+                    claim_ghost(world, entity, mass, other_entity)
+                continue
+
             mass += other_mass
-            world.delete(other_entity)
+            ate_player = True
+            delete_glob(world, other_entity)
 
-        world.set(entity, Mass, mass)
+        if ate_player:
+            set_mass(world, entity, mass)
 
-def eat_viruses(world: World):
+def eat_viruses(world: World, delta_time: float):
     config = assert_get(world, GameConfigSingleton, GameConfigSingleton)
-    vector_map = assert_get(world, VirusVectorMap, VirusVectorMap)
+    spatial_index = assert_get(world, SpatialIndexSingleton, SpatialIndexSingleton)
 
     minimum_mass = config.minimum_mass
     maximum_splits = config.maximum_splits
@@ -197,9 +417,8 @@ def eat_viruses(world: World):
     for parent, _ in Query(world, Session):
         ate_virus = False
 
-        for entity, mass, position, move_direction in Query(world, Mass, Position, MoveDirection).with_ids(parent):
-            radius = mass_to_radius(config, mass)
-            viruses_in_radius = vector_map.query_radius(position, radius)
+        for entity, mass, position, radius, move_direction in Query(world, Mass, Position, Radius, MoveDirection).with_ids(parent):
+            viruses_in_radius = spatial_index.query_radius(position, radius, Virus)
 
             for virus_entity in viruses_in_radius:
                 if not world.contains(virus_entity):
@@ -207,14 +426,12 @@ def eat_viruses(world: World):
 
                 virus_mass = assert_get(world, virus_entity, Mass)
                 virus_position = assert_get(world, virus_entity, Position)
-                virus_radius = mass_to_radius(config, virus_mass)
+                virus_radius = assert_get(world, virus_entity, Radius)
 
                 if not can_eat_glob(position, radius, virus_position, virus_radius):
                     continue
 
-                children = 0
-                for _ in Query(world, parent):
-                    children += 1
+                children = assert_get(world, parent, Stats).cells
 
                 total_mass = (mass + virus_mass)
                 splits_count = int(min(total_mass // minimum_mass, maximum_splits - children))
@@ -222,20 +439,23 @@ def eat_viruses(world: World):
 
                 new_mass = (total_mass - mass_split_off)
                 new_radius = mass_to_radius(config, new_mass)
-                world.set(entity, Mass, new_mass)
+                set_mass(world, entity, new_mass)
 
+                positions = []
+                velocities = []
                 for _ in range(splits_count):
                     rand_vector = vector.random()
-                    spawn_position = position + (rand_vector * new_radius)
-                    split_entity = spawn_player(world, parent, minimum_mass, spawn_position)
-                    world.set(split_entity, Velocity, rand_vector * 512)
-                    world.set(split_entity, MergeDebounce, merge_debounce)
-                    world.set(split_entity, MoveDirection, move_direction)
+                    positions.append(position + (rand_vector * new_radius))
+                    velocities.append(rand_vector * 512)
+
+                spawn_player_batch(
+                    world, parent, [minimum_mass] * splits_count, positions, velocities,
+                    [move_direction] * splits_count, merge_debounce
+                )
 
                 ate_virus = True
                 world.delete(virus_entity)
-                vector_map.remove(virus_entity, virus_position)
-                spawn_virus(world, config, vector_map)
+                assert_get(world, RespawnsSingleton, RespawnsSingleton).virus_deficit += 1
 
                 break
 
@@ -245,12 +465,11 @@ def eat_viruses(world: World):
 def update_velocity(world: World, delta_time: float):
     config = assert_get(world, GameConfigSingleton, GameConfigSingleton)
 
-    for entity, mass, velocity in Query(world, Mass, Velocity):
+    for entity, speed, velocity in Query(world, MaxSpeed, Velocity):
         velocity = vector.friction(velocity, config.friction, delta_time)
 
         direction = world.get(entity, MoveDirection)
         if (direction != None):
-            speed = speed_from_mass(config, mass)
             if (vector.magnitude(velocity) <= speed):
                 velocity = vector.accelerate(velocity, direction, speed, config.acceleration, delta_time)
 
@@ -258,13 +477,14 @@ def update_velocity(world: World, delta_time: float):
 
 def update_positions(world: World, delta_time: float):
     config = assert_get(world, GameConfigSingleton, GameConfigSingleton)
-    vector_map = assert_get(world, FoodVectorMap, FoodVectorMap)
 
     half_width = config.width / 2
     half_height = config.height / 2
 
-    for entity, mass, position, velocity in Query(world, Mass, Position, Velocity):
-        old_position = position
+    # parent -> [min_x, min_y, max_x, max_y, mass weighted x, mass weighted y, mass]
+    bounds: Dict[Id, list[float]] = {}
+
+    for entity, mass, position, radius, velocity in Query(world, Mass, Position, Radius, Velocity):
         position = Vector(
             clamp(position.x + velocity.x * delta_time, -half_width, half_width), 
             clamp(position.y + velocity.y * delta_time, -half_height, half_height)
@@ -272,13 +492,10 @@ def update_positions(world: World, delta_time: float):
 
         parent = world.get(entity, Parent)
         if (parent != None):
-            radius = mass_to_radius(config, mass)
-
-            for sibling_entity, sibling_mass, sibling_position in Query(world, Mass, Position).with_ids(MergeDebounce, parent):
+            for sibling_entity, sibling_position, sibling_radius in Query(world, Position, Radius).with_ids(MergeDebounce, parent):
                 if (sibling_entity == entity):
                     continue
 
-                sibling_radius = mass_to_radius(config, sibling_mass)
                 radius_summed = (radius + sibling_radius)
 
                 vector_to = (sibling_position - position)
@@ -288,87 +505,277 @@ def update_positions(world: World, delta_time: float):
                     push_amount = (radius_summed - distance_to) + 0.1
                     push_vector = vector.normalize(vector_to) if distance_to != 0 else Vector(1, 0)
                     position -= (push_vector * push_amount)
-        elif (world.has(entity, Food) and position != old_position):
-            vector_map.remove(entity, old_position)
-            vector_map.insert(entity, position)
+
+            owner_bounds = bounds.get(parent)
+            if owner_bounds == None:
+                bounds[parent] = [
+                    position.x - radius, position.y - radius, position.x + radius, position.y + radius,
+                    position.x * mass, position.y * mass, mass
+                ]
+            else:
+                owner_bounds[0] = min(owner_bounds[0], position.x - radius)
+                owner_bounds[1] = min(owner_bounds[1], position.y - radius)
+                owner_bounds[2] = max(owner_bounds[2], position.x + radius)
+                owner_bounds[3] = max(owner_bounds[3], position.y + radius)
+                owner_bounds[4] += position.x * mass
+                owner_bounds[5] += position.y * mass
+                owner_bounds[6] += mass
                     
         world.set(entity, Position, position)
 
-def erode_merge_debounces(world: World, delta_time: float):
-    for entity, debounce in Query(world, MergeDebounce):
-        debounce -= delta_time
-        if (debounce <= 0):
-            world.remove(entity, MergeDebounce)
+    for parent, owner_bounds in bounds.items():
+        stats = world.get(parent, Stats)
+        if stats == None:
             continue
 
-        world.set(entity, MergeDebounce, debounce)
+        min_x, min_y, max_x, max_y, weighted_x, weighted_y, total_mass = owner_bounds
+        stats.min_x, stats.min_y, stats.max_x, stats.max_y = min_x, min_y, max_x, max_y
+        if total_mass > 0:
+            stats.centroid_x = weighted_x / total_mass
+            stats.centroid_y = weighted_y / total_mass
 
-def serialize_world(world: World, server_time: float):
-    globs = []
-    players = []
-    world_state = [server_time, players, globs]
+# only clears the debounce it was scheduled for, a newer one keeps the cell apart
+def expire_merge_debounce(world: World, entity: Id, deadline: int):
+    if world.get(entity, MergeDebounce) == deadline:
+        world.remove(entity, MergeDebounce)
+
+def advance_timers(world: World, delta_time: float):
+    timers = assert_get(world, Timers, Timers)
+    timers.advance(delta_time)
 
+# viruses go first, there are few of them and they matter more than a bit of food
+def respawn_globs(world: World, delta_time: float):
+    respawns = assert_get(world, RespawnsSingleton, RespawnsSingleton)
+    if respawns.deferred or (respawns.food_deficit == 0 and respawns.virus_deficit == 0):
+        return
+
+    config = assert_get(world, GameConfigSingleton, GameConfigSingleton)
+    budget = config.respawn_budget
+    candidates = config.respawn_candidates
+
+    viruses = min(respawns.virus_deficit, budget)
+    respawns.virus_deficit -= viruses
+    for _ in range(viruses):
+        spawn_virus(world, config, candidates)
+
+    food = min(respawns.food_deficit, budget - viruses)
+    if food > 0:
+        respawns.food_deficit -= food
+        refill_food(world, config, food, candidates)
+
+# pooled food comes back first, its row only needs Position again and the new id keeps
+# clients from tweening it across the map. whatever the pool can't cover is spawned in bulk
+def refill_food(world: World, config: GameConfig, count: int, candidates: int):
+    pool = assert_get(world, FoodPool, FoodPool)
+    spatial_index = assert_get(world, SpatialIndexSingleton, SpatialIndexSingleton)
+
+    while count > 0 and len(pool) > 0:
+        entity = world.recycle(pool.pop())
+        # pooled ejected mass still carries its velocity
+        world.remove(entity, Velocity)
+        world.set(entity, Mass, random_food_mass(config))
+        world.set(entity, Position, sparse_position(config, spatial_index, candidates))
+        count -= 1
+
+    if count > 0:
+        spawn_food_batch(world, config, count, candidates)
+
+def serialize_players(world: World) -> tuple[list, Dict[Id, int]]:
+    players = []
     player_index_map = {}
 
     for entity, name, session in Query(world, Name, Session):
-        player_index = len(players)
-        player_index_map[entity] = player_index
+        player_index_map[entity] = len(players)
         players.append((name, session))
 
+    return players, player_index_map
+
+def glob_player_index(world: World, entity: Id, player_index_map: Dict[Id, int]) -> int | None:
+    parent = world.get(entity, Parent)
+    if parent != None:
+        return player_index_map.get(parent)
+    elif world.has(entity, Virus):
+        return -2
+
+    return -1
+
+def serialize_world(world: World, server_time: float):
+    players, player_index_map = serialize_players(world)
+    globs = []
+
     for entity, mass, position in Query(world, Mass, Position):
-        parent = world.get(entity, Parent)
-        player_index = -1
-        
-        if parent != None:
-            player_index = player_index_map.get(parent)
-        elif world.has(entity, Virus):
-            player_index = -2 
+        globs.append((entity, mass, (position.x, position.y), glob_player_index(world, entity, player_index_map)))
+
+    return [server_time, players, globs]
+
+def world_digest(world: World) -> str:
+    world_state = serialize_world(world, 0)
+    return hashlib.sha256(repr(world_state).encode()).hexdigest()
+
+# times socket event handlers as trace spans, costs one attribute check when tracing is off
+def traced_handler(handler):
+    name = handler.__name__
 
-        globs.append((entity, mass, (position.x, position.y), player_index))
+    def run(self, *args):
+        tracer = self.tracer
+        if not tracer.enabled:
+            return handler(self, *args)
 
-    return world_state
+        start = perf_counter()
+        result = handler(self, *args)
+        tracer.complete(name, "socket", start, perf_counter())
+        return result
+
+    run.__name__ = name
+    return run
 
 class GameInstance():
     world: World
     socket: SocketServer
     game_config: GameConfig
+    profiler: Profiler
+    tick_callbacks: List[Callable[[], None]]
+    # snapshots go to this socket.io room (everyone when None) and then to every listener
+    snapshot_room: str | None
+    snapshot_listeners: List[Callable[[list], None]]
+    recorder: InputRecorder | None
+    scheduler: Scheduler
+    garbage_collector: GarbageCollector
+    tracer: Tracer | NullTracer
+    overload: OverloadController
+    bandwidth: OverloadController
+    # process modes gate admissions in the front end off the level each process reports
+    gate_admissions: bool = True
 
     _tick_rate: float 
+    _snapshot_count: int
+    _tick_count: int
+    _allocation_sample_rate: int
+    _sampling_allocations: bool
+    _snapshot_steps: int
+    _snapshot_divisor: int
+    _interest_radius: float
+    _overload_interest_radius: float
+    _overload_bandwidth: float
+    _snapshot_bytes: int
+    _last_snapshot_time: float
+    _leaderboard_interval: float
+    _leaderboard_size: int
+    _last_leaderboard: float
+    _timestep: FixedTimestep | None
     _entity_map: Dict[str, Id]
-    _food_vector_map: VectorMap
+    _connected: set[str]
 
-    def __init__(self, socket: SocketServer, world: World, config: Config) -> None:
+    def __init__(
+        self, socket: SocketServer, world: World, config: Config,
+        seed: int | None = None, profiler: Profiler | None = None
+    ) -> None:
         game_config = config.game
-        food_vector_map = VectorMap()
-        virus_vector_map = VectorMap()
 
         self.world = world
         self.socket = socket
         self.game_config = game_config
+        # the gc controller and overload controller hold on to it, so it can't be swapped later
+        self.profiler = profiler if profiler != None else Profiler()
+        self.tick_callbacks = []
+        self.snapshot_room = None
+        self.snapshot_listeners = []
         
-        self._tick_rate = (1 / config.server.update_rate)
+        server_config = config.server
+        snapshot_rate = server_config.snapshot_rate or server_config.update_rate
+
+        self._tick_rate = (1 / server_config.update_rate)
+        self._snapshot_steps = max(1, round(server_config.update_rate / snapshot_rate))
+        self._snapshot_divisor = 1
+        self._interest_radius = server_config.interest_radius
+        self._overload_interest_radius = server_config.overload_interest_radius
+        self._overload_bandwidth = server_config.overload_bandwidth
+        self._snapshot_bytes = 0
+        self._last_snapshot_time = 0.0
+        self._leaderboard_interval = (1 / server_config.leaderboard_rate) if server_config.leaderboard_rate > 0 else 0
+        self._leaderboard_size = server_config.leaderboard_size
+        self._last_leaderboard = 0.0
+        self._timestep = None
+        if server_config.fixed_timestep:
+            self._timestep = FixedTimestep(self._tick_rate, server_config.maximum_catch_up_steps)
+        self._snapshot_count = 0
+        self._tick_count = 0
+        self._allocation_sample_rate = server_config.allocation_sample_rate
+        self._sampling_allocations = False
+        self.tracer = create_tracer(server_config.trace_path, server_config.trace_events_per_file, server_config.trace_files)
+        self.garbage_collector = GarbageCollector(server_config.gc_mode, self.profiler, self.tracer)
         self._entity_map = {}
-        self._food_vector_map = food_vector_map
+        self._connected = set()
+
+        self.overload = OverloadController(
+            self.profiler, server_config.overload_window, server_config.overload_high, server_config.overload_low
+        )
+        self.overload.listeners.append(self._shed_load)
+        # levels come from wall time, a replay has to get them from the recording
+        self.overload.listeners.append(lambda level: self._record("overload", "", level))
+
+        # only changes what goes out in snapshots, so it stays out of recordings
+        self.bandwidth = OverloadController(
+            self.profiler, server_config.overload_window,
+            server_config.overload_high if server_config.overload_bandwidth > 0 else 0, server_config.overload_low,
+            BANDWIDTH_STEPS, "bandwidth"
+        )
+        self.bandwidth.listeners.append(self._shed_load)
+
+        self.scheduler = Scheduler(server_config.scheduler_workers, self._run_system)
+        self._add_systems(self.scheduler)
+
+        self.recorder = None
+        if server_config.record_path:
+            if seed == None:
+                seed = random.randrange(2 ** 32)
+
+            header = RecordingHeader(seed, server_config.update_rate, game_config._asdict())
+            self.recorder = InputRecorder(server_config.record_path, header)
+
+        if seed != None:
+            random.seed(seed)
         
-        world.set(FoodVectorMap, FoodVectorMap, food_vector_map)
-        world.set(VirusVectorMap, VirusVectorMap, virus_vector_map)
+        world.set(FoodPool, FoodPool, [])
         world.set(GameConfigSingleton, GameConfigSingleton, game_config)
-        
-        for _ in range(game_config.maximum_food):
-            spawn_food(world, game_config, food_vector_map)
+        world.set(LeaderboardSingleton, LeaderboardSingleton, Leaderboard())
+        world.set(GhostClaims, GhostClaims, [])
+        world.set(RespawnsSingleton, RespawnsSingleton, Respawns())
+        world.set(Timers, Timers, TimerWheel(self._tick_rate))
+
+        # before anything spawns, so every glob carries both from the start
+        world.derive(Radius, Mass, lambda mass: mass_to_radius(game_config, mass))
+        world.derive(MaxSpeed, Mass, lambda mass: speed_from_mass(game_config, mass))
+        world.set(SpatialIndexSingleton, SpatialIndexSingleton, SpatialIndex(world, Position, SPATIAL_CELL_SIZE))
+
+        spawn_food_batch(world, game_config, game_config.maximum_food)
 
         for _ in range(game_config.maximum_viruses):
-            spawn_virus(world, game_config, virus_vector_map)
+            spawn_virus(world, game_config)
 
-        pass
+        self._shed_load(0)
 
-    def connect(self, sid: str, environ):
-        world = self.world
-        entity = world.entity()
-        world.set(entity, Session, sid)
-        self._entity_map[sid] = entity
+    def _record(self, event: str, sid: str, argument = None):
+        recorder = self.recorder
+        if recorder != None:
+            recorder.record(event, sid, argument)
+
+    @traced_handler
+    def connect(self, sid: str, environ) -> bool:
+        if self.gate_admissions and self.overload.sheds(SHED_ADMISSIONS):
+            self.profiler.count("rejected_sessions")
+            return False
 
+        # sessions only get an entity once they respawn, watching costs the world nothing
+        self._record("connect", sid)
+        self._connected.add(sid)
+        return True
+
+    @traced_handler
     def disconnect(self, sid: str):
+        self._record("disconnect", sid)
+        self._connected.discard(sid)
+
         world = self.world
         entity_map = self._entity_map
 
@@ -382,16 +789,29 @@ class GameInstance():
             world.delete(child)
                 
         world.delete(parent)
+        assert_get(world, LeaderboardSingleton, LeaderboardSingleton).remove(parent)
 
         print(f"* deleted entity: {parent}")    
 
-    def respawn(self, sid: str, name: str):
+    # sessions only get an entity once they have cells
+    def session_parent(self, sid: str) -> Id:
         parent = self._entity_map.get(sid, None)
-        if parent == None:
-            print(f"{sid} tried spawning but they are already alive")
-            return
-        
+        if parent != None:
+            return parent
+
         world = self.world
+        parent = world.entity()
+        world.set(parent, Session, sid)
+        world.set(parent, Stats, OwnerStats())
+        self._entity_map[sid] = parent
+        return parent
+
+    @traced_handler
+    def respawn(self, sid: str, name: str):
+        self._record("respawn", sid, name)
+
+        world = self.world
+        parent = self.session_parent(sid)
         world.set(parent, Name, name)
 
         position = Vector()
@@ -399,18 +819,19 @@ class GameInstance():
 
         print(f"* created entity: {child} ({name})")
 
+    @traced_handler
     def move(self, sid: str, target_point: tuple[float, float]):
+        self._record("move", sid, target_point)
+
         parent = self._entity_map.get(sid, None)
         if parent == None:
             print(f"{sid} tried moving but they aren't alive")
             return
         
         world = self.world
-        config = self.game_config
         target_position = point_to_vector(self.game_config, target_point)
 
-        for entity, mass, position in Query(world, Mass, Position).with_ids(parent):
-            radius = mass_to_radius(config, mass)
+        for entity, position, radius in Query(world, Position, Radius).with_ids(parent):
             direction = (target_position - position)
 
             distance = vector.magnitude(direction)
@@ -424,7 +845,10 @@ class GameInstance():
 
             world.set(entity, MoveDirection, direction)
 
+    @traced_handler
     def shoot(self, sid: str, target_point: tuple[float, float]):
+        self._record("shoot", sid, target_point)
+
         parent = self._entity_map.get(sid, None)
         if parent == None:
             print(f"{sid} tried shooting but they aren't alive")
@@ -432,14 +856,13 @@ class GameInstance():
         
         world = self.world
         game_config = self.game_config
-        food_vector_map = self._food_vector_map
         target_position = point_to_vector(game_config, target_point)
 
         eject_mass = game_config.eject_mass
         eject_diameter = mass_to_radius(game_config, eject_mass)
         needed_mass = game_config.minimum_mass + eject_mass
 
-        for entity, mass, position in Query(world, Mass, Position).with_ids(parent):
+        for entity, mass, position, radius in Query(world, Mass, Position, Radius).with_ids(parent):
             if (mass < needed_mass):
                 continue
 
@@ -449,18 +872,17 @@ class GameInstance():
             else:
                 direction = vector.normalize(direction)
 
-            radius = mass_to_radius(game_config, mass)
             spawn_offset = (direction * (radius + eject_diameter))
             spawn_position = position + spawn_offset
 
-            food_entity = spawn_food(world, game_config, food_vector_map)
-            world.set(food_entity, Mass, eject_mass)
-            world.set(food_entity, Position, spawn_position)
-            world.set(food_entity, Velocity, direction * 512)
+            spawn_ejected_mass(world, eject_mass, spawn_position, direction * 512)
 
-            world.set(entity, Mass, mass - eject_mass)
+            set_mass(world, entity, mass - eject_mass)
 
+    @traced_handler
     def split(self, sid: str, target_point: tuple[float, float]):
+        self._record("split", sid, target_point)
+
         parent = self._entity_map.get(sid, None)
         if parent == None:
             print(f"{sid} tried splitting but they aren't alive")
@@ -490,21 +912,281 @@ class GameInstance():
             spawn_position = position + (direction * radius)
             new_entities.append((half_mass, spawn_velocity, spawn_position))
 
-            world.set(entity, Mass, half_mass)
+            set_mass(world, entity, half_mass)
 
-        for entry in new_entities:
-            mass, velocity, position = entry
-            entity = spawn_player(world, parent, mass, position)
-            world.set(entity, Velocity, velocity)
-            world.set(entity, MergeDebounce, merge_debounce)
+        count = len(new_entities)
+        spawn_player_batch(
+            world, parent, 
+            [mass for mass, _, _ in new_entities], 
+            [position for _, _, position in new_entities], 
+            [velocity for _, velocity, _ in new_entities],
+            [Vector() for _ in range(count)], merge_debounce
+        )
 
-    async def init_game_loop(self):
+    def _run_system(self, name: str, system, *args):
+        if self._sampling_allocations:
+            return self._sample_system(name, system, *args)
+
+        start = perf_counter()
+        result = system(*args)
+        end = perf_counter()
+
+        self.profiler.record(name, end - start)
+        self.tracer.complete(name, "system", start, end)
+        return result
+
+    # tracing slows everything down, so sampled runs report bytes but no timings.
+    # systems sharing a scheduler stage trace into the same counters
+    def _sample_system(self, name: str, system, *args):
+        profiler = self.profiler
+
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = system(*args)
+        current, peak = tracemalloc.get_traced_memory()
+
+        profiler.gauge(f'allocated_bytes{{system="{name}"}}', peak - before)
+        profiler.gauge(f'retained_bytes{{system="{name}"}}', current - before)
+        return result
+
+    def _add_systems(self, scheduler: Scheduler):
+        # timer callbacks can touch anything
+        scheduler.add(system("advance_timers", advance_timers, exclusive=True))
+        scheduler.add(system(
+            "update_velocity", update_velocity,
+            reads=[MaxSpeed, MoveDirection, GameConfigSingleton], writes=[Velocity]
+        ))
+        scheduler.add(system(
+            "update_positions", update_positions,
+            reads=[Mass, Radius, Velocity, Parent, MergeDebounce, GameConfigSingleton], writes=[Position, SpatialIndexSingleton, Stats]
+        ))
+        scheduler.add(system("eat_viruses", eat_viruses, exclusive=True))
+        scheduler.add(system("eat_food", eat_food, exclusive=True))
+        scheduler.add(system("eat_players", eat_players, exclusive=True))
+        scheduler.add(system("respawn_globs", respawn_globs, exclusive=True))
+
+    def step(self, delta_time: float):
         world = self.world
+        profiler = self.profiler
+        garbage_collector = self.garbage_collector
+
+        self._tick_count += 1
+        sample_rate = self._allocation_sample_rate
+        sampling = sample_rate > 0 and (self._tick_count % sample_rate) == 0
+        already_tracing = tracemalloc.is_tracing()
+        if sampling:
+            if not already_tracing:
+                tracemalloc.start()
+            self._sampling_allocations = True
+
+        start = perf_counter()
+        garbage_collector.in_tick = True
+
+        self.scheduler.run(world, delta_time)
+
+        garbage_collector.in_tick = False
+        end = perf_counter()
+        elapsed = end - start
+        self.tracer.complete("tick", "tick", start, end)
+
+        if sampling:
+            self._sampling_allocations = False
+            if not already_tracing:
+                tracemalloc.stop()
+        else:
+            profiler.record("step", elapsed)
+
+        profiler.gauge("entities", len(world.entity_index.sparse))
+        profiler.gauge("archetypes", len(world.archetypes))
+        respawns = assert_get(world, RespawnsSingleton, RespawnsSingleton)
+        profiler.gauge("food_deficit", respawns.food_deficit)
+        profiler.gauge("virus_deficit", respawns.virus_deficit)
+
+        recorder = self.recorder
+        if recorder != None:
+            recorder.end_tick(delta_time)
+
+        timestep = self._timestep
+        if timestep != None:
+            profiler.gauge("timestep_overruns", timestep.overruns)
+            profiler.gauge("timestep_missed_deadlines", timestep.missed_deadlines)
+
+    def interest_radius(self) -> float:
+        radius = self._interest_radius
+        shed_radius = self._overload_interest_radius
+        # culling costs cpu, so it waits while ticks themselves are being shed
+        if shed_radius > 0 and self.bandwidth.sheds(SHED_INTEREST_RADIUS) and self.overload.level == 0:
+            radius = shed_radius if radius == 0 else min(radius, shed_radius)
+
+        return radius
+
+    def _shed_load(self, level: int):
+        overload = self.overload
+        self._snapshot_divisor = OVERLOAD_SNAPSHOT_DIVISOR if overload.sheds(SHED_SNAPSHOT_RATE) else 1
+        assert_get(self.world, RespawnsSingleton, RespawnsSingleton).deferred = overload.sheds(SHED_FOOD_RESPAWN)
+
+        profiler = self.profiler
+        profiler.gauge("snapshot_divisor", self._snapshot_divisor)
+        profiler.gauge("interest_radius", self.interest_radius())
+
+    # sessions with cells only get the globs around them. views are unions of grid cells, sessions
+    # whose views cover the same cells share one view and one encode, and every glob is bucketed
+    # from the full snapshot instead of being looked up again per session
+    def serialize_views(self, world_state: list, radius: float) -> List[tuple[List[str], list]]:
+        server_time, players, globs = world_state
+        cell_size = radius / INTEREST_CELLS_PER_RADIUS
+
+        groups: Dict[tuple[int, int, int, int], List[str]] = {}
+        for _, session, stats in Query(self.world, Session, Stats):
+            if stats.cells == 0:
+                continue
+
+            key = (
+                floor((stats.min_x - radius) / cell_size), floor((stats.min_y - radius) / cell_size),
+                floor((stats.max_x + radius) / cell_size), floor((stats.max_y + radius) / cell_size)
+            )
+            sessions = groups.get(key)
+            if sessions == None:
+                groups[key] = [session]
+            else:
+                sessions.append(session)
+
+        if len(groups) == 0:
+            return []
+
+        cells: Dict[tuple[int, int], list] = {}
+        for glob in globs:
+            x, y = glob[2]
+            key = (floor(x / cell_size), floor(y / cell_size))
+            cell = cells.get(key)
+            if cell == None:
+                cells[key] = [glob]
+            else:
+                cell.append(glob)
+
+        views = []
+        for (min_x, min_y, max_x, max_y), sessions in groups.items():
+            view_globs = []
+            for x in range(min_x, max_x + 1):
+                for y in range(min_y, max_y + 1):
+                    cell = cells.get((x, y))
+                    if cell != None:
+                        view_globs.extend(cell)
+
+            views.append((sessions, [server_time, players, view_globs]))
+
+        return views
+
+    async def snapshot(self, server_time: float):
+        profiler = self.profiler
         socket = self.socket
+
+        world_state = self._run_system("serialize_world", serialize_world, self.world, server_time)
+
+        self._snapshot_count += 1
+        if self._snapshot_count % SNAPSHOT_SIZE_SAMPLE_RATE == 1:
+            self._snapshot_bytes = len(json.dumps(world_state, separators=(",", ":")))
+            profiler.gauge("snapshot_bytes", self._snapshot_bytes)
+
+        # judged on full snapshots to every session, so culling doesn't talk the ladder back out of itself
+        if self._overload_bandwidth > 0:
+            demand = self._snapshot_bytes * len(self._connected) / self._overload_bandwidth
+            self.bandwidth.record(demand, server_time - self._last_snapshot_time)
+        self._last_snapshot_time = server_time
+
+        radius = self.interest_radius()
+        views = []
+        if radius > 0:
+            views = self._run_system("serialize_views", self.serialize_views, world_state, radius)
+            profiler.gauge("interest_views", len(views))
+
+        culled = [session for sessions, _ in views for session in sessions]
+        broadcast = radius == 0 or len(culled) < len(self._connected)
+
+        start = perf_counter()
+        for sessions, view in views:
+            await socket.emit("snapshot", view, to=sessions)
+
+        if broadcast:
+            await socket.emit("snapshot", world_state, to=self.snapshot_room, skip_sid=culled or None)
+        end = perf_counter()
+
+        for listener in self.snapshot_listeners:
+            listener(world_state)
+
+        profiler.record("emit", end - start)
+        self.tracer.complete("emit", "snapshot", start, end)
+
+    def memory_report(self) -> dict:
+        world = self.world
+        names = {value: name for name, value in globals().items() if isinstance(value, Id)}
+
+        return {
+            "world": world.memory_report(names),
+            "spatial_index": assert_get(world, SpatialIndexSingleton, SpatialIndexSingleton).memory_report(),
+            "food_pool": len(assert_get(world, FoodPool, FoodPool)),
+            "pending_timers": assert_get(world, Timers, Timers).pending,
+            "ranked_owners": len(assert_get(world, LeaderboardSingleton, LeaderboardSingleton)),
+            "sessions": len(self._entity_map),
+        }
+
+    def serialize_leaderboard(self) -> list:
+        world = self.world
+        leaderboard = assert_get(world, LeaderboardSingleton, LeaderboardSingleton)
+
+        entries = []
+        for owner, score in leaderboard.top(self._leaderboard_size):
+            entries.append([world.get(owner, Name), world.get(owner, Session), score])
+
+        return entries
+
+    async def broadcast_leaderboard(self, server_time: float):
+        interval = self._leaderboard_interval
+        if interval == 0 or (server_time - self._last_leaderboard) < interval:
+            return
+
+        self._last_leaderboard = server_time
+        entries = self._run_system("serialize_leaderboard", self.serialize_leaderboard)
+        await self.socket.emit("leaderboard", entries)
+
+    async def init_game_loop(self):
+        garbage_collector = self.garbage_collector
+        garbage_collector.start()
+
+        try:
+            if self._timestep != None:
+                await self._fixed_game_loop(self._timestep)
+            else:
+                await self._variable_game_loop()
+        finally:
+            garbage_collector.stop()
+            self.tracer.close()
+            if self.recorder != None:
+                self.recorder.close()
+
+    def _collect_idle(self, idle: float) -> float:
+        start = time()
+        if not self.garbage_collector.collect_idle(idle, self._tick_rate / 2):
+            return idle
+
+        return max(0, idle - (time() - start))
+
+    async def _sleep(self, duration: float):
+        tracer = self.tracer
+        if not tracer.enabled:
+            await sleep(duration)
+            return
+
+        start = perf_counter()
+        await sleep(duration)
+        tracer.complete("sleep", "loop", start, perf_counter())
+
+    async def _variable_game_loop(self):
         tick_rate = self._tick_rate
 
         last_time = time()
         server_time = 0.0
+        ticks_since_snapshot = 0
 
         while True:
             curr_time = time()
@@ -512,15 +1194,49 @@ class GameInstance():
             server_time += delta_time
             last_time = curr_time
 
-            erode_merge_debounces(world, delta_time)
-            update_velocity(world, delta_time)
-            update_positions(world, delta_time)
-            eat_viruses(world)
-            eat_food(world)
-            eat_players(world, delta_time)
-            
-            world_state = serialize_world(world, server_time)
-            await socket.emit("snapshot", world_state)
+            for callback in self.tick_callbacks:
+                callback()
+
+            self.step(delta_time)
+
+            ticks_since_snapshot += 1
+            if ticks_since_snapshot >= self._snapshot_divisor:
+                ticks_since_snapshot = 0
+                await self.snapshot(server_time)
+
+            await self.broadcast_leaderboard(server_time)
 
             elapsed = time() - curr_time
-            await sleep(max(0, tick_rate - elapsed))
\ No newline at end of file
+            self.overload.record(elapsed, delta_time)
+            await self._sleep(self._collect_idle(max(0, tick_rate - elapsed)))
+
+    async def _fixed_game_loop(self, timestep: FixedTimestep):
+        step = timestep.step
+        snapshot_steps = self._snapshot_steps
+
+        last_time = time()
+        steps_since_snapshot = 0
+
+        while True:
+            curr_time = time()
+            delta_time = curr_time - last_time
+            steps = timestep.advance(delta_time)
+            last_time = curr_time
+
+            for callback in self.tick_callbacks:
+                callback()
+
+            for _ in range(steps):
+                self.step(step)
+
+            steps_since_snapshot += steps
+            if steps_since_snapshot >= snapshot_steps * self._snapshot_divisor:
+                steps_since_snapshot = 0
+                await self.snapshot(timestep.steps * step)
+
+            await self.broadcast_leaderboard(timestep.steps * step)
+
+            work = time() - curr_time
+            timestep.record_work(work)
+            self.overload.record(work, delta_time)
+            await self._sleep(self._collect_idle(timestep.time_until_step(time() - last_time)))
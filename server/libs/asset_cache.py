@@ -0,0 +1,189 @@
+import asyncio
+import gzip
+import hashlib
+import os
+import stat
+from email.utils import formatdate
+from time import monotonic
+from typing import Dict, List, Tuple
+
+# brotli is optional, without it clients get gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("text/css", "text/html", "application/javascript", "application/json", "image/svg+xml")
+# preferred first
+ENCODINGS = ("br", "gzip")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+# seconds a loaded file is served before its mtime is checked again, webpack rewrites the bundle in watch mode
+REVALIDATE_INTERVAL = 1.0
+
+# a name carrying a content hash never changes, like app.3f2a9c1d.js
+def is_hashed(file_name: str) -> bool:
+    parts = file_name.split(".")
+    return any(len(part) >= 8 and all(character in "0123456789abcdef" for character in part) for part in parts[1:-1])
+
+def accepted_encodings(header: str) -> List[str]:
+    encodings = []
+    for part in header.split(","):
+        name, _, parameters = part.partition(";")
+        parameter, _, value = parameters.partition("=")
+        if parameter.strip() == "q":
+            try:
+                if float(value) <= 0:
+                    continue
+            except ValueError:
+                continue
+
+        encodings.append(name.strip().lower())
+
+    return encodings
+
+class Asset():
+    content_type: str
+    modified: int
+    size: int
+    etag: str
+    last_modified: str
+    cache_control: str
+    # content encoding -> body, "identity" is always there
+    bodies: Dict[str, bytes]
+    checked: float = 0.0
+
+    def __init__(self, content_type: str, modified: int, size: int, contents: bytes, cache_control: str) -> None:
+        self.content_type = content_type
+        self.modified = modified
+        self.size = size
+        self.etag = hashlib.sha1(contents).hexdigest()[:16]
+        self.last_modified = formatdate(modified / 1e9, usegmt=True)
+        self.cache_control = cache_control
+        self.bodies = {"identity": contents}
+
+        if not content_type in COMPRESSIBLE_TYPES:
+            return
+
+        compressed = {"gzip": gzip.compress(contents, 9, mtime=0)}
+        if brotli != None:
+            compressed["br"] = brotli.compress(contents)
+
+        for encoding, body in compressed.items():
+            if len(body) < len(contents):
+                self.bodies[encoding] = body
+
+    def select(self, accept_encoding: str) -> Tuple[str, bytes]:
+        accepted = accepted_encodings(accept_encoding)
+        for encoding in ENCODINGS:
+            body = self.bodies.get(encoding)
+            if body != None and encoding in accepted:
+                return encoding, body
+
+        return "identity", self.bodies["identity"]
+
+    # every encoding gets its own strong tag, they all name the same file version
+    def etag_for(self, encoding: str) -> str:
+        if encoding == "identity":
+            return f'"{self.etag}"'
+
+        return f'"{self.etag}-{encoding}"'
+
+    def matches(self, if_none_match: str) -> bool:
+        for tag in if_none_match.split(","):
+            tag = tag.strip().removeprefix("W/")
+            if tag == "*" or tag.strip('"').split("-")[0] == self.etag:
+                return True
+
+        return False
+
+    def modified_since(self, timestamp: float) -> bool:
+        return self.modified // 1_000_000_000 > int(timestamp)
+
+# files under `directory` kept in memory with their compressed variants.
+# stat, read and compression all run in the default executor, the loop only ever looks up dicts
+class AssetCache():
+    directory: str
+    content_types: Dict[str, str]
+    default_content_type: str
+    assets: Dict[str, Asset]
+
+    _loading: Dict[str, asyncio.Future]
+
+    def __init__(self, directory: str, content_types: Dict[str, str], default_content_type: str) -> None:
+        self.directory = os.path.normpath(directory)
+        self.content_types = content_types
+        self.default_content_type = default_content_type
+        self.assets = {}
+        self._loading = {}
+
+    # paths escaping the directory resolve to nothing, normpath never touches the disk
+    def resolve(self, path: str) -> str | None:
+        file_path = os.path.normpath(os.path.join(self.directory, path))
+        if os.path.commonpath((self.directory, file_path)) != self.directory:
+            return None
+
+        return file_path
+
+    async def get(self, path: str) -> Asset | None:
+        file_path = self.resolve(path)
+        if file_path == None:
+            return None
+
+        asset = self.assets.get(file_path)
+        if asset != None and monotonic() - asset.checked < REVALIDATE_INTERVAL:
+            return asset
+
+        # concurrent requests for the same file share one load
+        loading = self._loading.get(file_path)
+        if loading == None:
+            loading = asyncio.get_running_loop().run_in_executor(None, self._load, file_path, asset)
+            self._loading[file_path] = loading
+
+        try:
+            asset = await loading
+        finally:
+            self._loading.pop(file_path, None)
+
+        if asset == None:
+            self.assets.pop(file_path, None)
+            return None
+
+        asset.checked = monotonic()
+        self.assets[file_path] = asset
+        return asset
+
+    async def preload(self):
+        paths = await asyncio.get_running_loop().run_in_executor(None, self._walk)
+        await asyncio.gather(*[self.get(path) for path in paths])
+
+    def _walk(self) -> List[str]:
+        paths = []
+        for root, _, file_names in os.walk(self.directory):
+            for file_name in file_names:
+                paths.append(os.path.relpath(os.path.join(root, file_name), self.directory))
+
+        return paths
+
+    def _load(self, file_path: str, cached: Asset | None) -> Asset | None:
+        try:
+            status = os.stat(file_path)
+        except OSError:
+            return None
+
+        if not stat.S_ISREG(status.st_mode):
+            return None
+
+        if cached != None and cached.modified == status.st_mtime_ns and cached.size == status.st_size:
+            return cached
+
+        with open(file_path, mode="rb") as file:
+            contents = file.read()
+
+        file_name = os.path.basename(file_path)
+        extension = os.path.splitext(file_name)[1]
+        content_type = self.content_types.get(extension, self.default_content_type)
+        cache_control = IMMUTABLE_CACHE_CONTROL if is_hashed(file_name) else REVALIDATE_CACHE_CONTROL
+
+        return Asset(content_type, status.st_mtime_ns, status.st_size, contents, cache_control)
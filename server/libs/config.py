@@ -27,11 +27,57 @@ class GameConfig(NamedTuple):
     merge_debounce: float
     maximum_splits: int
 
+    # (min_x, min_y, max_x, max_y) food and viruses spawn in, the whole map when None
+    spawn_area: tuple[float, float, float, float] | None = None
+
+    # food and viruses respawned per tick at most, the rest waits for later ticks
+    respawn_budget: int = 32
+    # random positions tried per respawn, the emptiest wins. 1 spawns uniformly
+    respawn_candidates: int = 1
+
 class ServerConfig(NamedTuple):
     port: int
     hostname: str
     update_rate: int
 
+    fixed_timestep: bool = False
+    maximum_catch_up_steps: int = 4
+    snapshot_rate: int = 0
+
+    rooms: int = 1
+    room_capacity: int = 0
+    simulation_process: bool = False
+    record_path: str = ""
+    scheduler_workers: int = 1
+
+    leaderboard_rate: float = 2
+    leaderboard_size: int = 10
+
+    gc_mode: str = "default"
+    allocation_sample_rate: int = 0
+
+    trace_path: str = ""
+    trace_events_per_file: int = 200000
+    trace_files: int = 4
+
+    spectator_snapshot_rate: float = 0
+
+    # splits one map into columns x rows tiles, each simulated by its own process
+    tile_columns: int = 1
+    tile_rows: int = 1
+    tile_ghost_margin: float = 256
+
+    # sessions with cells only get globs this far past their cells, 0 sends the whole map
+    interest_radius: float = 0
+    # interest radius while shedding snapshot bandwidth
+    overload_interest_radius: float = 1024
+    # bytes per second full snapshots to every session may take before the interest radius is cut, 0 never cuts it
+    overload_bandwidth: float = 32000000
+    # tick utilization is judged once per window, above high sheds a step, below low restores one
+    overload_window: float = 1.0
+    overload_high: float = 0.9
+    overload_low: float = 0.6
+
 class Config(NamedTuple):
     game: GameConfig
     server: ServerConfig
@@ -62,14 +108,41 @@ class Config(NamedTuple):
             game_dict["base_radius"],
             game_dict["mass_radius_constant"],
             game_dict["merge_debounce"],
-            game_dict["maximum_splits"]
+            game_dict["maximum_splits"],
+            respawn_budget=game_dict.get("respawn_budget", 32),
+            respawn_candidates=game_dict.get("respawn_candidates", 1)
         )
 
         server_dict: dict = contents["server"]
         server_config = ServerConfig(
             server_dict["port"],
             server_dict["hostname"],
-            server_dict["update_rate"]
+            server_dict["update_rate"],
+            server_dict.get("fixed_timestep", False),
+            server_dict.get("maximum_catch_up_steps", 4),
+            server_dict.get("snapshot_rate", 0),
+            server_dict.get("rooms", 1),
+            server_dict.get("room_capacity", 0),
+            server_dict.get("simulation_process", False),
+            server_dict.get("record_path", ""),
+            server_dict.get("scheduler_workers", 1),
+            server_dict.get("leaderboard_rate", 2),
+            server_dict.get("leaderboard_size", 10),
+            server_dict.get("gc_mode", "default"),
+            server_dict.get("allocation_sample_rate", 0),
+            server_dict.get("trace_path", ""),
+            server_dict.get("trace_events_per_file", 200000),
+            server_dict.get("trace_files", 4),
+            server_dict.get("spectator_snapshot_rate", 0),
+            server_dict.get("tile_columns", 1),
+            server_dict.get("tile_rows", 1),
+            server_dict.get("tile_ghost_margin", 256),
+            server_dict.get("interest_radius", 0),
+            server_dict.get("overload_interest_radius", 1024),
+            server_dict.get("overload_bandwidth", 32000000),
+            server_dict.get("overload_window", 1.0),
+            server_dict.get("overload_high", 0.9),
+            server_dict.get("overload_low", 0.6)
         )
 
         return cls(game_config, server_config)
\ No newline at end of file
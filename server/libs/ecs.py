@@ -1,5 +1,6 @@
+import sys
 from dataclasses import dataclass
-from typing import List, Dict, NamedTuple, Tuple, TypeVar, Generic, TypeVarTuple, Unpack
+from typing import Any, Callable, List, Dict, NamedTuple, Set, Tuple, TypeVar, Generic, TypeVarTuple, Unpack
 
 Data = TypeVar("Data")
 DataTuple = TypeVarTuple("DataTuple")
@@ -37,14 +38,30 @@ class EntityIndex():
         self.sparse = {}
         pass
 
+SparseStore = Dict[Id, Any]
+OnSet = Callable[[Id, Any], None]
+OnRemove = Callable[[Id], None]
+
 class ComponentRecord():
     size: int = 0
     is_tag: bool
+    # sparse components live in `store` instead of archetype columns,
+    # so setting or removing them never moves the entity
+    is_sparse: bool
+    store: SparseStore
     archetypes: Dict[ArchetypeId, int]
+    # components recomputed from this one whenever it is set, see World.derive
+    derived: List[Tuple[Id, Callable[[Any], Any]]]
+    # (on_set, on_remove) callbacks, see World.observe
+    observers: List[Tuple[OnSet, OnRemove]]
 
-    def __init__(self, is_tag: bool):
+    def __init__(self, is_tag: bool, is_sparse: bool = False):
         self.is_tag = is_tag
+        self.is_sparse = is_sparse
+        self.store = {}
         self.archetypes = {}
+        self.derived = []
+        self.observers = []
 
 class AddComponentException(Exception):
     pass
@@ -55,10 +72,21 @@ class SetTagException(Exception):
 class SetNoneException(Exception):
     pass
 
+class SpawnBatchException(Exception):
+    pass
+
+class DeriveException(Exception):
+    pass
+
+class ObserveException(Exception):
+    pass
+
 ComponentIndex = Dict[Id, ComponentRecord]
 
 TAG_COLUMN = []
 MAX_COMPONENT_ID = 256
+# values sampled per column when estimating its size
+MEMORY_SAMPLE_SIZE = 64
 ROOT_ARCHETYPE_ID = 0
 ROOT_ARCHETYPE_TYPE = ""
 
@@ -67,6 +95,7 @@ EcsRest = Id(MAX_COMPONENT_ID + 2)
 
 max_prereg_tag = EcsRest
 max_prereg_component = 0
+sparse_components: Set[Id] = set()
 
 def is_tag_column(column: List) -> bool:
     return id(column) == id(TAG_COLUMN)
@@ -74,6 +103,23 @@ def is_tag_column(column: List) -> bool:
 def hash_types(types: Types) -> Type:
     return "_".join([str(id) for id in types])
 
+def value_bytes(value) -> int:
+    size = sys.getsizeof(value)
+    attributes = getattr(value, "__dict__", None)
+    if attributes != None:
+        size += sys.getsizeof(attributes)
+    return size
+
+# shallow estimate, the list itself plus its values extrapolated from an even sample
+def estimate_column_bytes(values: List) -> int:
+    size = sys.getsizeof(values)
+    count = len(values)
+    if count == 0:
+        return size
+
+    sample = values[::max(1, count // MEMORY_SAMPLE_SIZE)]
+    return size + int(sum(value_bytes(value) for value in sample) / len(sample) * count)
+
 def find_insert(types: Types, to_add: Id) -> int:
     for index, id in enumerate(types):
         if id == to_add:
@@ -89,6 +135,8 @@ class World():
     archetype_index: ArchetypeIndex
     archetype_edges: ArchetypeEdges
     root_archetype: Archetype
+    sparse_stores: List[SparseStore]
+    observed: List[Tuple[Id, ComponentRecord]]
 
     def __init__(self):
         root_archetype = Archetype(ROOT_ARCHETYPE_ID, ROOT_ARCHETYPE_TYPE, [], [], {}, [])
@@ -100,6 +148,8 @@ class World():
         self.archetype_index = {ROOT_ARCHETYPE_TYPE: root_archetype}
         self.archetype_edges = {ROOT_ARCHETYPE_ID: {}}
         self.root_archetype = root_archetype
+        self.sparse_stores = []
+        self.observed = []
 
         for _ in range(0, EcsRest):
             self.entity()
@@ -112,8 +162,13 @@ class World():
 
     def __component_record_create(self, component: Id) -> ComponentRecord:
         is_tag = not self.has(component, EcsComponent)
-        record = ComponentRecord(is_tag)
+        is_sparse = (not is_tag) and component in sparse_components
+        record = ComponentRecord(is_tag, is_sparse)
         self.component_index[component] = record
+
+        if is_sparse:
+            self.sparse_stores.append(record.store)
+
         return record
 
     def __component_record_ensure(self, component: Id) -> ComponentRecord:
@@ -235,7 +290,202 @@ class World():
         entity_index.sparse[entity_id] = Record(root_archetype, row)
 
         return entity_id
+
+    # hands the entity's row and component values to a fresh id without moving it,
+    # the old id stops existing just like after a delete
+    def recycle(self, entity: Id) -> Id | None:
+        observed = self.__observed_values(entity)
+
+        entity_index = self.entity_index
+        record = entity_index.sparse.pop(entity, None)
+        if (record == None):
+            return None
+
+        entity_id = Id(entity_index.size)
+        entity_index.size += 1
+
+        record.archetype.entities[record.row] = entity_id
+        entity_index.sparse[entity_id] = record
+
+        for store in self.sparse_stores:
+            if entity in store:
+                store[entity_id] = store.pop(entity)
+
+        for component_record, value in observed:
+            for on_set, on_remove in component_record.observers:
+                on_remove(entity)
+                on_set(entity_id, value)
+
+        return entity_id
+
+    def __observed_values(self, entity: Id) -> List[Tuple[ComponentRecord, Any]]:
+        observed = []
+        for component, component_record in self.observed:
+            value = self.get(entity, component)
+            if value != None:
+                observed.append((component_record, value))
+
+        return observed
+    
+    # appends every row straight into the archetype holding all of the components,
+    # columns line up with the non-tag components in the order they were given
+    def spawn_batch(self, components: Types, *columns: Column) -> List[Id]:
+        components, columns = self.__derive_columns(components, columns)
+        component_records = [self.__component_record_ensure(component) for component in components]
+        archetype = self.__archetype_ensure(sorted(set(
+            component for component, component_record in zip(components, component_records) if not component_record.is_sparse
+        )))
+
+        data_components = [component for component, component_record in zip(components, component_records) if not component_record.is_tag]
+        if len(data_components) != len(columns) or len(columns) == 0:
+            raise SpawnBatchException("Expected one column for every non-tag component")
+
+        count = len(columns[0])
+        for column in columns:
+            if len(column) != count:
+                raise SpawnBatchException("Columns must all have the same length")
+
+        entity_index = self.entity_index
+        sparse = entity_index.sparse
+        entities = archetype.entities
+
+        first_id = entity_index.size
+        first_row = len(entities)
+        entity_index.size += count
+
+        spawned = [Id(first_id + index) for index in range(count)]
+        entities.extend(spawned)
+
+        for index, entity in enumerate(spawned):
+            sparse[entity] = Record(archetype, first_row + index)
+
+        columns_map = archetype.columns_map
+        component_index = self.component_index
+        for component, column in zip(data_components, columns):
+            component_record = component_index[component]
+            if component_record.is_sparse:
+                component_record.store.update(zip(spawned, column))
+            else:
+                columns_map[component].extend(column)
+
+            for on_set, _ in component_record.observers:
+                for entity, value in zip(spawned, column):
+                    on_set(entity, value)
+
+        return spawned
     
+    def __derive_columns(self, components: Types, columns: Tuple[Column, ...]) -> Tuple[Types, Tuple[Column, ...]]:
+        component_index = self.component_index
+        data_components = [
+            component for component in components
+            if not self.__component_record_ensure(component).is_tag
+        ]
+
+        derived_components = []
+        derived_columns = []
+        for component, column in zip(data_components, columns):
+            for target, function in component_index[component].derived:
+                if target in components or target in derived_components:
+                    continue
+
+                derived_components.append(target)
+                derived_columns.append([function(value) for value in column])
+
+        if len(derived_components) == 0:
+            return components, columns
+
+        return [*components, *derived_components], (*columns, *derived_columns)
+
+    # keeps `target` equal to function(source) on every entity that has `source`,
+    # setting the source recomputes the target and removing it removes the target
+    def derive(self, target: Id[Data], source: Id, function: Callable[[Any], Data]):
+        source_record = self.__component_record_ensure(source)
+        target_record = self.__component_record_ensure(target)
+        if source_record.is_tag or target_record.is_tag:
+            raise DeriveException("Tags cannot be derived or derived from")
+
+        if target == source or any(derived_target == target for derived_target, _ in source_record.derived):
+            raise DeriveException("Component is already derived from this source")
+
+        source_record.derived.append((target, function))
+
+    # calls on_set(entity, value) after the component is set on an entity (including
+    # spawn_batch and the new id of a recycle) and on_remove(entity) once an entity
+    # loses it through remove, delete or recycle
+    def observe(self, component: Id, on_set: OnSet, on_remove: OnRemove):
+        component_record = self.__component_record_ensure(component)
+        if component_record.is_tag:
+            raise ObserveException("Tags cannot be observed")
+
+        if len(component_record.observers) == 0:
+            self.observed.append((component, component_record))
+
+        component_record.observers.append((on_set, on_remove))
+
+    def memory_report(self, names: Dict[Id, str] = {}) -> dict:
+        names = {EcsComponent: "EcsComponent", EcsRest: "EcsRest", **names}
+
+        def label(id: Id) -> str:
+            return names.get(id, str(int(id)))
+
+        archetypes = []
+        empty_archetypes = 0
+        archetype_bytes = 0
+
+        for archetype in self.archetypes.values():
+            rows = len(archetype.entities)
+            if rows == 0:
+                empty_archetypes += 1
+
+            columns = {}
+            for component, column in zip(archetype.types, archetype.columns):
+                if not is_tag_column(column):
+                    columns[label(component)] = estimate_column_bytes(column)
+
+            size = sys.getsizeof(archetype.entities) + sum(columns.values())
+            archetype_bytes += size
+            archetypes.append({
+                "id": archetype.id,
+                "components": [label(component) for component in archetype.types],
+                "rows": rows,
+                "bytes": size,
+                "column_bytes": columns,
+            })
+
+        archetypes.sort(key=lambda report: report["bytes"], reverse=True)
+
+        component_records = {}
+        sparse_bytes = 0
+        for component, component_record in self.component_index.items():
+            record_report = {"archetypes": len(component_record.archetypes)}
+            if component_record.is_sparse:
+                store = component_record.store
+                store_bytes = sys.getsizeof(store) + estimate_column_bytes(list(store.values()))
+                sparse_bytes += store_bytes
+                record_report["sparse_entries"] = len(store)
+                record_report["sparse_bytes"] = store_bytes
+
+            component_records[label(component)] = record_report
+
+        entity_index = self.entity_index
+        sparse = entity_index.sparse
+        records = list(sparse.values())[:1]
+        entity_index_bytes = sys.getsizeof(sparse) + len(sparse) * (value_bytes(records[0]) if records else 0)
+
+        return {
+            "entities": len(sparse),
+            "entity_ids_allocated": entity_index.size,
+            "entity_index_bytes": entity_index_bytes,
+            "archetype_count": len(archetypes),
+            "empty_archetypes": empty_archetypes,
+            "archetype_edges": sum(len(edges) for edges in self.archetype_edges.values()),
+            "archetype_bytes": archetype_bytes,
+            "sparse_bytes": sparse_bytes,
+            "total_bytes": entity_index_bytes + archetype_bytes + sparse_bytes,
+            "component_records": component_records,
+            "archetypes": archetypes,
+        }
+
     def component(self, ttype: type[Data]) -> Id[Data]:
         component_index = self.component_index
 
@@ -252,10 +502,17 @@ class World():
         if (record == None):
             return False
         
-        archetype = record.archetype
+        columns_map = record.archetype.columns_map
 
         for component in components:
-            if not component in archetype.columns_map:
+            if component in columns_map:
+                continue
+
+            component_record = self.component_index.get(component)
+            if component_record == None or not component_record.is_sparse:
+                return False
+
+            if not entity in component_record.store:
                 return False
 
         return True
@@ -269,6 +526,10 @@ class World():
         columns_map = archetype.columns_map
 
         if not (component in columns_map):
+            component_record = self.component_index.get(component)
+            if component_record != None and component_record.is_sparse:
+                return component_record.store.get(entity)
+
             return None
 
         column = columns_map[component]
@@ -304,32 +565,63 @@ class World():
         record = self.entity_index.sparse.get(entity)
         if (record == None):
             return
-        
-        source_archetype = record.archetype
-        to_archetype = source_archetype
 
-        if not (component in source_archetype.columns_map):
-            to_archetype = self.__find_archetype_with(component, source_archetype)
-            self.__entity_move(entity, record, to_archetype)
-        
-        column = to_archetype.columns_map[component]
-        if len(column) > record.row:
-            column[record.row] = value
+        if (id_record.is_sparse):
+            id_record.store[entity] = value
         else:
-            column.insert(record.row, value)
+            source_archetype = record.archetype
+            to_archetype = source_archetype
+
+            if not (component in source_archetype.columns_map):
+                to_archetype = self.__find_archetype_with(component, source_archetype)
+                self.__entity_move(entity, record, to_archetype)
+            
+            column = to_archetype.columns_map[component]
+            if len(column) > record.row:
+                column[record.row] = value
+            else:
+                column.insert(record.row, value)
+
+        derived = id_record.derived
+        if len(derived) > 0:
+            # once an entity carries its derived components they sit in the same archetype,
+            # so updating them is a plain column write. a missing one moves the entity,
+            # so the archetype and row are read again for every target
+            for target, function in derived:
+                row = record.row
+                column = record.archetype.columns_map.get(target)
+                if column != None and len(column) > row:
+                    column[row] = function(value)
+                else:
+                    self.set(entity, target, function(value))
+
+        for on_set, _ in id_record.observers:
+            on_set(entity, value)
 
     def remove(self, entity: Id, component: Id):
         record = self.entity_index.sparse.get(entity)
         if (record == None):
             return
 
+        id_record = self.__component_record_ensure(component)
+        for target, _ in id_record.derived:
+            self.remove(entity, target)
+
         source_archetype = record.archetype
         source_id = source_archetype.id
-        id_record = self.__component_record_ensure(component)
+
+        if (id_record.is_sparse):
+            if id_record.store.pop(entity, None) != None:
+                for _, on_remove in id_record.observers:
+                    on_remove(entity)
+            return
 
         index = id_record.archetypes.get(source_id, None)
         if (index == None):
             return
+
+        for _, on_remove in id_record.observers:
+            on_remove(entity)
         
         archetype_edges = self.archetype_edges
         source_edges = archetype_edges[source_id]
@@ -351,6 +643,10 @@ class World():
         if (record == None):
             return
 
+        for component_record, _ in self.__observed_values(entity):
+            for _, on_remove in component_record.observers:
+                on_remove(entity)
+
         row = record.row
         archetype = record.archetype
 
@@ -379,6 +675,10 @@ class World():
         del entities[last_row]
         del entity_index.sparse[entity]
 
+        for store in self.sparse_stores:
+            if entity in store:
+                del store[entity]
+
 class Query():
     world: World
     terms: List[Id]
@@ -391,6 +691,13 @@ class Query():
     entities: List[Id] = []
     columns_map: Dict[Id, Column] = {}
 
+    # set when a sparse component is part of the query, iteration then walks these candidates,
+    # either the smallest sparse store or the rows of the matched archetypes if there are fewer
+    sparse_entities: List[Id] | None = None
+    sparse_with: List[SparseStore] = []
+    sparse_without: List[SparseStore] = []
+    term_stores: List[SparseStore | None] = []
+
     def with_ids(self, *terms: Id):
         self.with_terms += terms
         return self
@@ -408,11 +715,46 @@ class Query():
 
     def __iter__(self):
         world = self.world
-        with_terms = self.with_terms
-        without_terms = self.without_terms
         archetypes = world.archetypes
         component_index = world.component_index
 
+        with_terms = []
+        without_terms = []
+        sparse_with: List[SparseStore] = []
+        sparse_without: List[SparseStore] = []
+
+        for component in self.with_terms:
+            component_record = component_index.get(component, None)
+            if component_record != None and component_record.is_sparse:
+                sparse_with.append(component_record.store)
+            else:
+                with_terms.append(component)
+
+        for component in self.without_terms:
+            component_record = component_index.get(component, None)
+            if component_record != None and component_record.is_sparse:
+                sparse_without.append(component_record.store)
+            else:
+                without_terms.append(component)
+
+        self.sparse_without = sparse_without
+
+        driver: SparseStore | None = None
+        if len(sparse_with) > 0:
+            driver = min(sparse_with, key=len)
+            self.sparse_with = sparse_with
+            self.term_stores = []
+            for component in self.terms:
+                component_record = component_index.get(component, None)
+                is_sparse = component_record != None and component_record.is_sparse
+                self.term_stores.append(component_record.store if is_sparse else None)
+
+            self.with_terms = with_terms
+            self.without_terms = without_terms
+            if len(driver) == 0:
+                self.sparse_entities = []
+                return self
+
         smallest_record: ComponentRecord | None = None
         for component in with_terms:
             component_record = component_index.get(component, None)
@@ -424,6 +766,7 @@ class Query():
             elif component_record.size < smallest_record.size:
                 smallest_record = component_record
 
+        rows = 0
         if smallest_record != None:
             matched_archetypes = self.matched_archetypes
             for archetype_id in smallest_record.archetypes:
@@ -449,43 +792,140 @@ class Query():
 
                 matched_archetypes.append(archetype)
 
+                # a dense term can be far more selective than the smallest sparse store, like the
+                # few cells of one owner against every debounced cell in the world
+                rows += len(archetype.entities)
+                if driver != None and rows > len(driver):
+                    self.sparse_entities = list(driver)
+                    return self
+
+        if driver != None:
+            if smallest_record == None:
+                self.sparse_entities = list(driver)
+            else:
+                # same order the archetype walk in __next__ would give
+                self.sparse_entities = [
+                    entity for archetype in self.matched_archetypes for entity in reversed(archetype.entities)
+                ]
+
         return self
+
+    def __next_sparse(self):
+        sparse_entities = self.sparse_entities
+        assert sparse_entities != None
+
+        entity_records = self.world.entity_index.sparse
+        with_terms = self.with_terms
+        without_terms = self.without_terms
+        sparse_with = self.sparse_with
+        sparse_without = self.sparse_without
+
+        index = self.index + 1
+        while index < len(sparse_entities):
+            entity = sparse_entities[index]
+            index += 1
+
+            record = entity_records.get(entity)
+            if record == None:
+                continue
+
+            columns_map = record.archetype.columns_map
+
+            doesnt_match = False
+            for component in with_terms:
+                if not component in columns_map:
+                    doesnt_match = True
+                    break
+
+            if not doesnt_match:
+                for component in without_terms:
+                    if component in columns_map:
+                        doesnt_match = True
+                        break
+
+            if not doesnt_match:
+                for store in sparse_with:
+                    if not entity in store:
+                        doesnt_match = True
+                        break
+
+            if not doesnt_match:
+                for store in sparse_without:
+                    if entity in store:
+                        doesnt_match = True
+                        break
+
+            if doesnt_match:
+                continue
+
+            self.index = index - 1
+
+            row = record.row
+            values = []
+            for component, store in zip(self.terms, self.term_stores):
+                if store != None:
+                    values.append(store[entity])
+                    continue
+
+                column = columns_map[component]
+                values.append(None if is_tag_column(column) else column[row])
+
+            return entity, *values
+
+        self.index = index
+        raise StopIteration
     
     def __next__(self):
+        if self.sparse_entities != None:
+            return self.__next_sparse()
+
         index = self.index
         terms = self.terms
         entities = self.entities
         columns_map = self.columns_map
         last_archtype = self.last_archetype
         matched_archetypes = self.matched_archetypes
+        sparse_without = self.sparse_without
         
-        entity = None
-        if index >= 0:
-            try:
-                entity = entities[index]
-            except:
-                pass
+        while True:
+            entity = None
+            if index >= 0:
+                try:
+                    entity = entities[index]
+                except:
+                    pass
+
+            while entity == None:
+                last_archtype += 1
+                self.last_archetype = last_archtype
+
+                if last_archtype >= len(matched_archetypes):
+                    raise StopIteration
+                
+                archetype = matched_archetypes[last_archtype]
+                entities = archetype.entities
+                index = len(entities) - 1
+
+                if index == -1:
+                    continue
 
-        while entity == None:
-            last_archtype += 1
-            self.last_archetype = last_archtype
+                entity = entities[index]
+                columns_map = archetype.columns_map
+                self.entities = entities
+                self.columns_map = columns_map
 
-            if last_archtype >= len(matched_archetypes):
-                raise StopIteration
-            
-            archetype = matched_archetypes[last_archtype]
-            entities = archetype.entities
-            index = len(entities) - 1
+            self.index = (index - 1)
 
-            if index == -1:
-                continue
+            excluded = False
+            for store in sparse_without:
+                if entity in store:
+                    excluded = True
+                    break
 
-            entity = entities[index]
-            columns_map = archetype.columns_map
-            self.entities = entities
-            self.columns_map = columns_map
+            if not excluded:
+                break
 
-        self.index = (index - 1)
+            index -= 1
 
         values = []
         for component in terms:
@@ -500,8 +940,12 @@ def tag() -> Id[None]:
     max_prereg_tag += 1
     return Id(max_prereg_tag)
 
-def component(ttype: type[Data]) -> Id[Data]:
+def component(ttype: type[Data], sparse: bool = False) -> Id[Data]:
     global max_prereg_component
     component_id = max_prereg_component
     max_prereg_component += 1
+
+    if sparse:
+        sparse_components.add(Id(component_id))
+
     return Id(component_id)
\ No newline at end of file
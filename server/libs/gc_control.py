@@ -0,0 +1,81 @@
+import gc
+from libs.profiler import Profiler
+from libs.tracer import Tracer, NullTracer
+from time import perf_counter
+
+# "default" leaves the collector alone apart from timing its pauses,
+# "deferred" freezes the startup heap and only runs gen2 between ticks
+GC_MODES = ("default", "deferred")
+
+# high enough that gen2 never triggers by itself
+DEFERRED_GEN2_THRESHOLD = 1_000_000
+# gen1 collections since the last gen2 before an idle gen2 pass is due
+IDLE_GEN2_COUNT = 10
+# past this many a gen2 pass runs even without idle time, so cycles can't pile up forever
+FORCED_GEN2_COUNT = IDLE_GEN2_COUNT * 4
+
+class GarbageCollector():
+    mode: str
+    profiler: Profiler
+    tracer: Tracer | NullTracer
+    in_tick: bool = False
+
+    _started: float = 0.0
+    _threshold: tuple[int, int, int] | None = None
+
+    def __init__(self, mode: str, profiler: Profiler, tracer: Tracer | NullTracer = NullTracer()) -> None:
+        assert mode in GC_MODES, f"unknown gc mode {mode}"
+        self.mode = mode
+        self.profiler = profiler
+        self.tracer = tracer
+
+    def start(self):
+        if self.mode != "deferred":
+            gc.callbacks.append(self._on_collect)
+            return
+
+        # everything alive now (config, food, viruses, modules) is long lived,
+        # frozen objects are never traversed by later collections
+        gc.collect()
+        gc.freeze()
+        self.profiler.gauge("gc_frozen_objects", gc.get_freeze_count())
+
+        self._threshold = gc.get_threshold()
+        gc.set_threshold(self._threshold[0], self._threshold[1], DEFERRED_GEN2_THRESHOLD)
+        gc.callbacks.append(self._on_collect)
+
+    def stop(self):
+        if self._on_collect in gc.callbacks:
+            gc.callbacks.remove(self._on_collect)
+
+        if self._threshold != None:
+            gc.set_threshold(*self._threshold)
+            gc.unfreeze()
+            self._threshold = None
+
+    def collect_idle(self, idle: float, minimum_idle: float) -> bool:
+        if self.mode != "deferred":
+            return False
+
+        pending = gc.get_count()[2]
+        if pending < IDLE_GEN2_COUNT:
+            return False
+
+        if idle < minimum_idle and pending < FORCED_GEN2_COUNT:
+            return False
+
+        gc.collect(2)
+        return True
+
+    def _on_collect(self, phase: str, info: dict):
+        if phase == "start":
+            self._started = perf_counter()
+            return
+
+        end = perf_counter()
+        name = f"gc_gen{info['generation']}"
+
+        profiler = self.profiler
+        profiler.record(name, end - self._started)
+        self.tracer.complete(name, "gc", self._started, end)
+        profiler.count("gc_collections_in_tick" if self.in_tick else "gc_collections_idle")
@@ -0,0 +1,42 @@
+from bisect import bisect_left, insort
+from typing import Dict, Hashable, List
+
+# entries are kept sorted as (-score, key) so the best scores come first
+# and ties always resolve in the same order
+class Leaderboard():
+    entries: List[tuple[float, Hashable]]
+    scores: Dict[Hashable, float]
+
+    def __init__(self) -> None:
+        self.entries = []
+        self.scores = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _discard(self, key: Hashable):
+        score = self.scores.pop(key, None)
+        if score == None:
+            return
+
+        entries = self.entries
+        index = bisect_left(entries, (-score, key))
+        del entries[index]
+
+    def update(self, key: Hashable, score: float):
+        previous = self.scores.get(key)
+        if previous == score:
+            return
+
+        self._discard(key)
+        self.scores[key] = score
+        insort(self.entries, (-score, key))
+
+    def remove(self, key: Hashable):
+        self._discard(key)
+
+    def score(self, key: Hashable) -> float | None:
+        return self.scores.get(key)
+
+    def top(self, count: int) -> List[tuple[Hashable, float]]:
+        return [(key, -score) for score, key in self.entries[:count]]
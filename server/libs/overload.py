@@ -0,0 +1,95 @@
+from libs.profiler import Profiler
+from typing import Callable, List, Tuple
+
+# load shedding steps in the order they kick in, a level keeps every step below it
+SHED_SNAPSHOT_RATE = 1
+SHED_FOOD_RESPAWN = 2
+SHED_ADMISSIONS = 3
+SHED_STEPS = ("snapshot_rate", "food_respawn", "admissions")
+
+# snapshot bandwidth has its own ladder, culling per session costs more cpu than one
+# shared broadcast so it can't be a step against tick overload
+SHED_INTEREST_RADIUS = 1
+BANDWIDTH_STEPS = ("interest_radius",)
+
+OverloadListener = Callable[[int], None]
+
+# compares time spent working with wall time over a window and moves one level per window,
+# up past `high` utilization and back down below `low`, so a level has to pay off before
+# the next one is taken and recovering doesn't flap straight back into overload.
+# a `high` of 0 turns shedding off, metrics are prefixed with `name`
+class OverloadController():
+    profiler: Profiler
+    window: float
+    high: float
+    low: float
+    steps: Tuple[str, ...]
+    name: str
+    level: int = 0
+    listeners: List[OverloadListener]
+
+    _work: float = 0.0
+    _elapsed: float = 0.0
+
+    def __init__(
+        self, profiler: Profiler, window: float, high: float, low: float,
+        steps: Tuple[str, ...] = SHED_STEPS, name: str = "overload"
+    ) -> None:
+        self.profiler = profiler
+        self.window = window
+        self.high = high
+        self.low = low
+        self.steps = steps
+        self.name = name
+        self.listeners = []
+
+        self._report(0.0)
+
+    def sheds(self, step: int) -> bool:
+        return self.level >= step
+
+    def record(self, work: float, elapsed: float):
+        if self.high <= 0:
+            return
+
+        self._work += work
+        self._elapsed += elapsed
+        if self._elapsed < self.window:
+            return
+
+        utilization = self._work / self._elapsed
+        self._work = 0.0
+        self._elapsed = 0.0
+
+        level = self.level
+        if utilization > self.high and level < len(self.steps):
+            self.level += 1
+            self.profiler.count(f"{self.name}_escalations")
+        elif utilization < self.low and level > 0:
+            self.level -= 1
+            self.profiler.count(f"{self.name}_recoveries")
+
+        self._report(utilization)
+        if self.level != level:
+            self._notify()
+
+    # replays take the levels from their recording instead of measuring their own
+    def set_level(self, level: int):
+        if level == self.level:
+            return
+
+        self.level = level
+        self._report(0.0)
+        self._notify()
+
+    def _notify(self):
+        for listener in self.listeners:
+            listener(self.level)
+
+    def _report(self, utilization: float):
+        profiler = self.profiler
+        name = self.name
+        profiler.gauge(f"{name}_level", self.level)
+        profiler.gauge(f"{name}_utilization", round(utilization, 4))
+        for index, step in enumerate(self.steps):
+            profiler.gauge(f'{name}_step{{step="{step}"}}', int(self.level > index))
@@ -0,0 +1,57 @@
+from collections import deque
+from typing import Deque, Dict, List
+
+WINDOW_SIZE = 512
+PERCENTILES = (0.5, 0.99)
+
+def percentile(sorted_samples: List[float], fraction: float) -> float:
+    if len(sorted_samples) == 0:
+        return 0.0
+
+    index = int(round(fraction * (len(sorted_samples) - 1)))
+    return sorted_samples[index]
+
+class Profiler():
+    timings: Dict[str, Deque[float]]
+    gauges: Dict[str, float]
+    counters: Dict[str, int]
+
+    def __init__(self, window_size: int = WINDOW_SIZE) -> None:
+        self.window_size = window_size
+        self.timings = {}
+        self.gauges = {}
+        self.counters = {}
+
+    def record(self, name: str, elapsed: float):
+        samples = self.timings.get(name)
+        if samples == None:
+            samples = deque(maxlen=self.window_size)
+            self.timings[name] = samples
+
+        samples.append(elapsed)
+
+    def gauge(self, name: str, value: float):
+        self.gauges[name] = value
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def percentiles(self, name: str) -> Dict[float, float]:
+        samples = sorted(self.timings.get(name, ()))
+        return {fraction: percentile(samples, fraction) for fraction in PERCENTILES}
+
+    def render(self) -> str:
+        lines = []
+
+        for name in self.timings:
+            for fraction, value in self.percentiles(name).items():
+                lines.append(f'glob_seconds{{name="{name}",quantile="{fraction}"}} {value:.9f}')
+
+        for name, value in self.gauges.items():
+            lines.append(f"glob_{name} {value}")
+
+        for name, value in self.counters.items():
+            lines.append(f"glob_{name}_total {value}")
+
+        lines.append("")
+        return "\n".join(lines)
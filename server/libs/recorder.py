@@ -0,0 +1,69 @@
+import gzip
+import json
+from typing import IO, Any, Iterator, List, NamedTuple
+
+# one json document per line, the first line is the header
+# every following line is a tick: [delta_time, [[event, sid, argument], ...]]
+
+Event = List[Any]
+
+FLUSH_INTERVAL = 40
+
+class RecordingHeader(NamedTuple):
+    seed: int
+    update_rate: int
+    game: dict
+
+class RecordedTick(NamedTuple):
+    delta_time: float
+    events: List[Event]
+
+def open_log(file_path: str, mode: str) -> IO[str]:
+    if file_path.endswith(".gz"):
+        return gzip.open(file_path, mode + "t")
+
+    return open(file_path, mode)
+
+class InputRecorder():
+    file: IO[str]
+    events: List[Event]
+    ticks: int = 0
+
+    def __init__(self, file_path: str, header: RecordingHeader) -> None:
+        self.file = open_log(file_path, "w")
+        self.events = []
+        self.file.write(json.dumps(header._asdict()) + "\n")
+
+    def record(self, event: str, sid: str, argument: Any = None):
+        self.events.append([event, sid, argument])
+
+    def end_tick(self, delta_time: float):
+        self.file.write(json.dumps([delta_time, self.events], separators=(",", ":")) + "\n")
+        self.events = []
+        self.ticks += 1
+
+        if self.ticks % FLUSH_INTERVAL == 0:
+            self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+def read_recording(file_path: str) -> tuple[RecordingHeader, Iterator[RecordedTick]]:
+    file = open_log(file_path, "r")
+    header = RecordingHeader(**json.loads(file.readline()))
+
+    def ticks() -> Iterator[RecordedTick]:
+        with file:
+            try:
+                for line in file:
+                    # a server that was killed mid write leaves half a tick behind
+                    if not line.endswith("\n"):
+                        return
+
+                    delta_time, events = json.loads(line)
+                    yield RecordedTick(delta_time, events)
+            except EOFError:
+                # gzip stream cut off before its end marker, the ticks before it still replay
+                return
+
+    return header, ticks()
@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+from libs.ecs import Id
+from typing import Any, Callable, FrozenSet, Iterable, List, NamedTuple
+
+SystemFunction = Callable[..., Any]
+SystemRunner = Callable[..., Any]
+
+class System(NamedTuple):
+    name: str
+    run: SystemFunction
+    reads: FrozenSet[Id]
+    writes: FrozenSet[Id]
+    # spawns, deletes or moves entities between archetypes, which nothing can run beside
+    exclusive: bool = False
+
+def system(name: str, run: SystemFunction, reads: Iterable[Id] = (), writes: Iterable[Id] = (), exclusive: bool = False) -> System:
+    return System(name, run, frozenset(reads), frozenset(writes), exclusive)
+
+def conflicts(a: System, b: System) -> bool:
+    if a.exclusive or b.exclusive:
+        return True
+
+    return not (a.writes.isdisjoint(b.writes) and a.writes.isdisjoint(b.reads) and b.writes.isdisjoint(a.reads))
+
+def run_directly(name: str, run: SystemFunction, *args):
+    return run(*args)
+
+class Scheduler():
+    systems: List[System]
+    stages: List[List[System]]
+    workers: int
+
+    _runner: SystemRunner
+    _executor: ThreadPoolExecutor | None
+
+    def __init__(self, workers: int = 1, runner: SystemRunner = run_directly) -> None:
+        self.systems = []
+        self.stages = []
+        self.workers = workers
+
+        self._runner = runner
+        self._executor = None
+        if workers > 1:
+            self._executor = ThreadPoolExecutor(workers, thread_name_prefix="system")
+
+    def add(self, system: System):
+        self.systems.append(system)
+        self.stages = self.build()
+
+    # a system lands in the stage after the last earlier system it conflicts with,
+    # so conflicting systems keep their declared order and the rest share a stage
+    def build(self) -> List[List[System]]:
+        stages: List[List[System]] = []
+        placed: List[tuple[System, int]] = []
+
+        for system in self.systems:
+            stage = 0
+            for other, other_stage in placed:
+                if conflicts(system, other):
+                    stage = max(stage, other_stage + 1)
+
+            if stage == len(stages):
+                stages.append([])
+
+            stages[stage].append(system)
+            placed.append((system, stage))
+
+        return stages
+
+    def run(self, *args):
+        runner = self._runner
+        executor = self._executor
+
+        for stage in self.stages:
+            if executor == None or len(stage) == 1:
+                for system in stage:
+                    runner(system.name, system.run, *args)
+                continue
+
+            futures = [executor.submit(runner, system.name, system.run, *args) for system in stage]
+            for future in futures:
+                future.result()
+
+    def shutdown(self):
+        if self._executor != None:
+            self._executor.shutdown()
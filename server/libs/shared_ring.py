@@ -0,0 +1,113 @@
+import struct
+from multiprocessing import shared_memory
+
+# single producer, single consumer message ring over shared memory
+# the cursors are monotonic byte counts, the producer only writes the write cursor
+# and the consumer only writes the read cursor so neither side needs a lock
+
+HEADER = struct.Struct("<QQ")
+LENGTH = struct.Struct("<I")
+WRAP_MARKER = 0xFFFFFFFF
+
+WRITE_CURSOR_OFFSET = 0
+READ_CURSOR_OFFSET = 8
+
+class RingFullException(Exception):
+    pass
+
+class SharedRing():
+    memory: shared_memory.SharedMemory
+    capacity: int
+
+    def __init__(self, memory: shared_memory.SharedMemory) -> None:
+        self.memory = memory
+        self.capacity = memory.size - HEADER.size
+        self._buffer = memory.buf
+
+    @classmethod
+    def create(cls, capacity: int):
+        memory = shared_memory.SharedMemory(create=True, size=HEADER.size + capacity)
+        HEADER.pack_into(memory.buf, 0, 0, 0)
+        return cls(memory)
+
+    @classmethod
+    def attach(cls, name: str):
+        return cls(shared_memory.SharedMemory(name=name))
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def _cursor(self, offset: int) -> int:
+        return struct.unpack_from("<Q", self._buffer, offset)[0]
+
+    def push(self, payload: bytes) -> bool:
+        buffer = self._buffer
+        capacity = self.capacity
+
+        write_cursor = self._cursor(WRITE_CURSOR_OFFSET)
+        read_cursor = self._cursor(READ_CURSOR_OFFSET)
+        free = capacity - (write_cursor - read_cursor)
+
+        needed = LENGTH.size + len(payload)
+        if needed > capacity:
+            raise RingFullException(f"Message of {len(payload)} bytes can never fit in the ring")
+
+        position = write_cursor % capacity
+        remaining = capacity - position
+
+        if needed > remaining:
+            if (remaining + needed) > free:
+                return False
+
+            if remaining >= LENGTH.size:
+                LENGTH.pack_into(buffer, HEADER.size + position, WRAP_MARKER)
+
+            write_cursor += remaining
+            position = 0
+        elif needed > free:
+            return False
+
+        offset = HEADER.size + position
+        LENGTH.pack_into(buffer, offset, len(payload))
+        buffer[offset + LENGTH.size:offset + needed] = payload
+
+        # publish only after the payload is in place
+        struct.pack_into("<Q", buffer, WRITE_CURSOR_OFFSET, write_cursor + needed)
+        return True
+
+    def pop(self) -> bytes | None:
+        buffer = self._buffer
+        capacity = self.capacity
+
+        write_cursor = self._cursor(WRITE_CURSOR_OFFSET)
+        read_cursor = self._cursor(READ_CURSOR_OFFSET)
+
+        while read_cursor < write_cursor:
+            position = read_cursor % capacity
+            remaining = capacity - position
+
+            if remaining < LENGTH.size:
+                read_cursor += remaining
+                continue
+
+            offset = HEADER.size + position
+            length = LENGTH.unpack_from(buffer, offset)[0]
+            if length == WRAP_MARKER:
+                read_cursor += remaining
+                continue
+
+            start = offset + LENGTH.size
+            payload = bytes(buffer[start:start + length])
+            struct.pack_into("<Q", buffer, READ_CURSOR_OFFSET, read_cursor + LENGTH.size + length)
+            return payload
+
+        struct.pack_into("<Q", buffer, READ_CURSOR_OFFSET, read_cursor)
+        return None
+
+    def close(self):
+        self._buffer = None
+        self.memory.close()
+
+    def unlink(self):
+        self.memory.unlink()
@@ -0,0 +1,212 @@
+import math
+import sys
+from libs.ecs import World, Id, Query
+from libs.vector import Vector
+from typing import Dict, Iterator, List, Tuple
+
+CellKey = Tuple[int, int]
+
+# uniform grid over every entity holding the observed position component.
+# the world keeps it in sync through observers, so systems only ever query it
+class SpatialIndex():
+    world: World
+    cell_size: float
+    cells: Dict[CellKey, Dict[Id, Vector]]
+    keys: Dict[Id, CellKey]
+
+    # occupied cell range, only ever grows. bounds the nearest search
+    min_key: CellKey | None = None
+    max_key: CellKey | None = None
+
+    def __init__(self, world: World, component: Id[Vector], cell_size: float) -> None:
+        self.world = world
+        self.cell_size = cell_size
+        self.cells = {}
+        self.keys = {}
+
+        for entity, position in Query(world, component):
+            self.insert(entity, position)
+
+        world.observe(component, self.insert, self.remove)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def key(self, x: float, y: float) -> CellKey:
+        cell_size = self.cell_size
+        return (math.floor(x / cell_size), math.floor(y / cell_size))
+
+    def insert(self, entity: Id, position: Vector):
+        key = self.key(position.x, position.y)
+        keys = self.keys
+        cells = self.cells
+
+        old_key = keys.get(entity)
+        if old_key == key:
+            cells[key][entity] = position
+            return
+
+        if old_key != None:
+            self.__discard(entity, old_key)
+
+        keys[entity] = key
+        cell = cells.get(key)
+        if cell == None:
+            cell = {}
+            cells[key] = cell
+            self.__grow(key)
+
+        cell[entity] = position
+
+    def remove(self, entity: Id):
+        key = self.keys.pop(entity, None)
+        if key != None:
+            self.__discard(entity, key)
+
+    def __discard(self, entity: Id, key: CellKey):
+        cells = self.cells
+        cell = cells[key]
+        del cell[entity]
+        if len(cell) == 0:
+            del cells[key]
+
+    def __grow(self, key: CellKey):
+        min_key = self.min_key
+        max_key = self.max_key
+        if min_key == None or max_key == None:
+            self.min_key = key
+            self.max_key = key
+            return
+
+        self.min_key = (min(min_key[0], key[0]), min(min_key[1], key[1]))
+        self.max_key = (max(max_key[0], key[0]), max(max_key[1], key[1]))
+
+    # walks whichever is smaller, the cells in range or the occupied ones
+    def __cells_in(self, min_key: CellKey, max_key: CellKey) -> Iterator[Dict[Id, Vector]]:
+        cells = self.cells
+        min_x, min_y = min_key
+        max_x, max_y = max_key
+
+        if (max_x - min_x + 1) * (max_y - min_y + 1) > len(cells):
+            for (x, y), cell in cells.items():
+                if min_x <= x <= max_x and min_y <= y <= max_y:
+                    yield cell
+            return
+
+        for x in range(min_x, max_x + 1):
+            for y in range(min_y, max_y + 1):
+                cell = cells.get((x, y))
+                if cell != None:
+                    yield cell
+
+    # entities within `radius` of `position`, optionally only those carrying `tag`
+    def query_radius(self, position: Vector, radius: float, tag: Id | None = None) -> List[Id]:
+        world = self.world
+        x, y = position.x, position.y
+        radius_squared = radius * radius
+
+        collected_ids = []
+        for cell in self.__cells_in(self.key(x - radius, y - radius), self.key(x + radius, y + radius)):
+            for entity, other in cell.items():
+                dx = other.x - x
+                dy = other.y - y
+                if dx * dx + dy * dy > radius_squared:
+                    continue
+
+                if tag == None or world.has(entity, tag):
+                    collected_ids.append(entity)
+
+        return collected_ids
+
+    def query_rect(self, min_x: float, min_y: float, max_x: float, max_y: float, tag: Id | None = None) -> List[Id]:
+        world = self.world
+
+        collected_ids = []
+        for cell in self.__cells_in(self.key(min_x, min_y), self.key(max_x, max_y)):
+            for entity, other in cell.items():
+                if not (min_x <= other.x <= max_x and min_y <= other.y <= max_y):
+                    continue
+
+                if tag == None or world.has(entity, tag):
+                    collected_ids.append(entity)
+
+        return collected_ids
+
+    # up to `count` entities closest to `position`, nearest first
+    def nearest(self, position: Vector, count: int, tag: Id | None = None, maximum_distance: float = math.inf) -> List[Id]:
+        min_key = self.min_key
+        max_key = self.max_key
+        if count <= 0 or min_key == None or max_key == None or len(self.cells) == 0:
+            return []
+
+        world = self.world
+        cells = self.cells
+        cell_size = self.cell_size
+        x, y = position.x, position.y
+        center_x, center_y = self.key(x, y)
+        maximum_squared = maximum_distance * maximum_distance
+
+        last_ring = max(
+            center_x - min_key[0], max_key[0] - center_x,
+            center_y - min_key[1], max_key[1] - center_y
+        )
+
+        found: List[Tuple[float, Id]] = []
+        ring = 0
+        while ring <= last_ring:
+            for key in ring_keys(center_x, center_y, ring):
+                cell = cells.get(key)
+                if cell == None:
+                    continue
+
+                for entity, other in cell.items():
+                    dx = other.x - x
+                    dy = other.y - y
+                    distance_squared = dx * dx + dy * dy
+                    if distance_squared > maximum_squared:
+                        continue
+
+                    if tag == None or world.has(entity, tag):
+                        found.append((distance_squared, entity))
+
+            # every cell past this ring is at least ring * cell_size away
+            reach = ring * cell_size
+            if reach > maximum_distance:
+                break
+
+            if len(found) >= count:
+                found.sort()
+                if found[count - 1][0] <= reach * reach:
+                    break
+
+            ring += 1
+
+        found.sort()
+        return [entity for _, entity in found[:count]]
+
+    def memory_report(self) -> dict:
+        cells = self.cells
+        sizes = [len(cell) for cell in cells.values()]
+
+        return {
+            "cells": len(cells),
+            "ids": len(self.keys),
+            "largest_cell": max(sizes, default=0),
+            "bytes": (
+                sys.getsizeof(cells) + sys.getsizeof(self.keys) +
+                sum(sys.getsizeof(cell) for cell in cells.values())
+            ),
+        }
+
+def ring_keys(center_x: int, center_y: int, ring: int) -> Iterator[CellKey]:
+    if ring == 0:
+        yield (center_x, center_y)
+        return
+
+    for x in range(center_x - ring, center_x + ring + 1):
+        yield (x, center_y - ring)
+        yield (x, center_y + ring)
+
+    for y in range(center_y - ring + 1, center_y + ring):
+        yield (center_x - ring, y)
+        yield (center_x + ring, y)
@@ -0,0 +1,113 @@
+import math
+from typing import Any, Callable, List
+
+# hierarchical timer wheel keyed by tick, every level has 64 slots and each slot
+# of a level spans a whole turn of the level below it. timers sit in the coarsest
+# level that fits their delay and cascade down as their deadline gets closer,
+# so advancing only touches the timers that are due or need to move down a level
+
+SLOT_BITS = 6
+SLOTS = 1 << SLOT_BITS
+SLOT_MASK = SLOTS - 1
+LEVELS = 4
+
+TimerCallback = Callable[..., Any]
+
+class Timer():
+    deadline: int
+    callback: TimerCallback
+    args: tuple
+    cancelled: bool = False
+
+    def __init__(self, deadline: int, callback: TimerCallback, args: tuple) -> None:
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+
+class TimerWheel():
+    resolution: float
+    tick: int = 0
+    pending: int = 0
+
+    accumulator: float = 0.0
+    levels: List[List[List[Timer]]]
+
+    def __init__(self, resolution: float) -> None:
+        self.resolution = resolution
+        self.levels = [[[] for _ in range(SLOTS)] for _ in range(LEVELS)]
+
+    # the tick a timer scheduled now with this delay fires on, never the current one
+    def deadline(self, delay: float) -> int:
+        ticks = math.ceil(delay / self.resolution - 1e-9)
+        return self.tick + max(1, ticks)
+
+    def schedule(self, delay: float, callback: TimerCallback, *args) -> Timer:
+        return self.schedule_at(self.deadline(delay), callback, *args)
+
+    def schedule_at(self, deadline: int, callback: TimerCallback, *args) -> Timer:
+        timer = Timer(max(deadline, self.tick + 1), callback, args)
+        self._insert(timer)
+        self.pending += 1
+        return timer
+
+    def cancel(self, timer: Timer):
+        if not timer.cancelled:
+            timer.cancelled = True
+            self.pending -= 1
+
+    def _insert(self, timer: Timer):
+        deadline = timer.deadline
+        delta = deadline - self.tick
+
+        level = 0
+        while level < LEVELS - 1 and delta >= (1 << (SLOT_BITS * (level + 1))):
+            level += 1
+
+        slot = (deadline >> (SLOT_BITS * level)) & SLOT_MASK
+        self.levels[level][slot].append(timer)
+
+    def _step(self) -> List[Timer]:
+        self.tick += 1
+        tick = self.tick
+        levels = self.levels
+
+        # a level only cascades when every level below it has wrapped around
+        top = 1
+        while top < LEVELS and (tick & ((1 << (SLOT_BITS * top)) - 1)) == 0:
+            top += 1
+
+        for level in range(top - 1, 0, -1):
+            slot = (tick >> (SLOT_BITS * level)) & SLOT_MASK
+            timers = levels[level][slot]
+            levels[level][slot] = []
+
+            for timer in timers:
+                if not timer.cancelled:
+                    self._insert(timer)
+
+        slot = tick & SLOT_MASK
+        due = levels[0][slot]
+        levels[0][slot] = []
+
+        return due
+
+    # turns the wheel once per elapsed resolution and runs every timer that came due,
+    # returns how many timers fired
+    def advance(self, elapsed: float) -> int:
+        resolution = self.resolution
+        accumulator = self.accumulator + elapsed
+        steps = int((accumulator + resolution * 1e-6) // resolution)
+        self.accumulator = max(0.0, accumulator - steps * resolution)
+
+        fired = 0
+        for _ in range(steps):
+            for timer in self._step():
+                if timer.cancelled:
+                    continue
+
+                timer.cancelled = True
+                self.pending -= 1
+                fired += 1
+                timer.callback(*timer.args)
+
+        return fired
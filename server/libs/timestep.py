@@ -0,0 +1,39 @@
+class FixedTimestep():
+    step: float
+    max_steps: int
+
+    accumulator: float = 0.0
+    steps: int = 0
+
+    # loop iterations whose work took longer than one step
+    overruns: int = 0
+    # simulation steps dropped because the catch-up budget ran out
+    missed_deadlines: int = 0
+
+    def __init__(self, step: float, max_steps: int) -> None:
+        self.step = step
+        self.max_steps = max(1, max_steps)
+
+    def advance(self, elapsed: float) -> int:
+        step = self.step
+        max_steps = self.max_steps
+
+        accumulator = self.accumulator + elapsed
+        steps = int(accumulator // step)
+
+        if steps > max_steps:
+            self.missed_deadlines += (steps - max_steps)
+            accumulator -= (steps - max_steps) * step
+            steps = max_steps
+
+        self.accumulator = accumulator - (steps * step)
+        self.steps += steps
+
+        return steps
+
+    def record_work(self, elapsed: float):
+        if elapsed > self.step:
+            self.overruns += 1
+
+    def time_until_step(self, since_advance: float) -> float:
+        return max(0.0, self.step - self.accumulator - since_advance)
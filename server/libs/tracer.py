@@ -0,0 +1,123 @@
+import json
+import os
+import threading
+from time import perf_counter
+from typing import IO
+
+# writes chrome trace-event json (chrome://tracing, ui.perfetto.dev).
+# every file is a json array that gets closed on rotation or close, the viewers
+# also accept the unterminated array a crashed server leaves behind
+
+BUFFER_SIZE = 1024
+
+class NullTracer():
+    enabled = False
+
+    def complete(self, name: str, category: str, start: float, end: float):
+        pass
+
+    def instant(self, name: str, category: str):
+        pass
+
+    def close(self):
+        pass
+
+class Tracer():
+    enabled = True
+
+    path: str
+    events_per_file: int
+    max_files: int
+
+    _pid: int
+    _origin: float
+    _buffer: list
+    _file: IO[str]
+    _file_index: int = 0
+    _file_events: int = 0
+
+    def __init__(self, path: str, events_per_file: int, max_files: int) -> None:
+        self.path = path
+        self.events_per_file = max(1, events_per_file)
+        self.max_files = max(1, max_files)
+
+        self._pid = os.getpid()
+        self._origin = perf_counter()
+        self._buffer = []
+        self._file = self._open(0)
+
+    def _file_path(self, index: int) -> str:
+        base, extension = os.path.splitext(self.path)
+        return f"{base}.{index}{extension or '.json'}"
+
+    def _open(self, index: int):
+        file = open(self._file_path(index), "w")
+        file.write("[\n")
+        file.write(json.dumps({
+            "name": "process_name", "ph": "M", "pid": self._pid,
+            "args": {"name": f"glob-game {self._pid}"}
+        }))
+        return file
+
+    def _rotate(self):
+        self._file.write("\n]\n")
+        self._file.close()
+
+        self._file_index += 1
+        self._file_events = 0
+        self._file = self._open(self._file_index)
+
+        stale_index = self._file_index - self.max_files
+        if stale_index >= 0:
+            try:
+                os.remove(self._file_path(stale_index))
+            except FileNotFoundError:
+                pass
+
+    def _push(self, event: dict):
+        buffer = self._buffer
+        buffer.append(event)
+        if len(buffer) >= BUFFER_SIZE:
+            self.flush()
+
+    def complete(self, name: str, category: str, start: float, end: float):
+        origin = self._origin
+        self._push({
+            "name": name, "cat": category, "ph": "X",
+            "ts": (start - origin) * 1e6, "dur": (end - start) * 1e6,
+            "pid": self._pid, "tid": threading.get_ident()
+        })
+
+    def instant(self, name: str, category: str):
+        self._push({
+            "name": name, "cat": category, "ph": "i", "s": "p",
+            "ts": (perf_counter() - self._origin) * 1e6,
+            "pid": self._pid, "tid": threading.get_ident()
+        })
+
+    def flush(self):
+        buffer = self._buffer
+        self._buffer = []
+
+        for event in buffer:
+            if self._file_events >= self.events_per_file:
+                self._rotate()
+
+            self._file.write(",\n" + json.dumps(event, separators=(",", ":")))
+            self._file_events += 1
+
+        self._file.flush()
+
+    def close(self):
+        if self._file.closed:
+            return
+
+        self.flush()
+        self._file.write("\n]\n")
+        self._file.close()
+
+def create_tracer(path: str, events_per_file: int, max_files: int) -> Tracer | NullTracer:
+    if not path:
+        return NullTracer()
+
+    return Tracer(path, events_per_file, max_files)
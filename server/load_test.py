@@ -0,0 +1,249 @@
+import socketio
+import aiohttp
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import re
+import string
+import os
+from libs.config import Config
+from libs.profiler import percentile
+from statistics import mean, pstdev
+from time import perf_counter
+from typing import Dict, List
+
+config = Config.from_file(os.path.join(os.path.dirname(__file__), "../config.json"))
+
+MOVE_INTERVAL = 0.05
+RESPAWN_DELAY = 1.0
+SPLIT_CHANCE = 0.01
+SHOOT_CHANCE = 0.03
+WANDER_DISTANCE = 512
+SIZE_SAMPLE_RATE = 10
+
+METRIC_PATTERN = re.compile(r'^glob_(\w+)(?:\{([^}]*)\})? (\S+)$')
+
+def random_name() -> str:
+    return "bot_" + "".join(random.choices(string.ascii_lowercase, k=6))
+
+class Bot():
+    client: socketio.AsyncClient
+    alive: bool = False
+    position: tuple[float, float] = (0.0, 0.0)
+    last_respawn: float = 0.0
+
+    receive_times: List[float]
+    offsets: List[float]
+    sizes: List[int]
+
+    def __init__(self) -> None:
+        self.client = socketio.AsyncClient(reconnection=False)
+        self.receive_times = []
+        self.offsets = []
+        self.sizes = []
+        self.client.on("snapshot", self.on_snapshot)
+
+    async def on_snapshot(self, world_state: list):
+        now = perf_counter()
+        server_time, players, globs = world_state
+
+        self.receive_times.append(now)
+        self.offsets.append(now - server_time)
+
+        if len(self.receive_times) % SIZE_SAMPLE_RATE == 1:
+            self.sizes.append(len(json.dumps(world_state, separators=(",", ":"))))
+
+        sid = self.client.get_sid()
+        alive = False
+        for entity, mass, position, player_index in globs:
+            if player_index >= 0 and players[player_index][1] == sid:
+                alive = True
+                self.position = position
+                break
+
+        self.alive = alive
+
+    async def run(self, url: str, duration: float):
+        client = self.client
+        await client.connect(url, transports=["websocket"])
+
+        width = config.game.width / 2
+        height = config.game.height / 2
+        # a list like the browser sends, socketio spreads a tuple over the handler arguments
+        target = [0.0, 0.0]
+        end_time = perf_counter() + duration
+
+        while perf_counter() < end_time:
+            now = perf_counter()
+            if not self.alive and (now - self.last_respawn) > RESPAWN_DELAY:
+                self.last_respawn = now
+                await client.emit("respawn", random_name())
+
+            if random.random() < 0.05:
+                target = [
+                    max(-width, min(width, self.position[0] + random.uniform(-WANDER_DISTANCE, WANDER_DISTANCE))),
+                    max(-height, min(height, self.position[1] + random.uniform(-WANDER_DISTANCE, WANDER_DISTANCE)))
+                ]
+
+            await client.emit("move", target)
+
+            if random.random() < SPLIT_CHANCE:
+                await client.emit("split", target)
+            elif random.random() < SHOOT_CHANCE:
+                await client.emit("shoot", target)
+
+            await asyncio.sleep(MOVE_INTERVAL)
+
+        await client.disconnect()
+
+    def stats(self) -> dict:
+        intervals = [b - a for a, b in zip(self.receive_times, self.receive_times[1:])]
+
+        # server time and local time share no epoch, so latency is relative to the fastest snapshot
+        fastest = min(self.offsets, default=0.0)
+        latencies = [offset - fastest for offset in self.offsets]
+
+        return {
+            "snapshots": len(self.receive_times),
+            "latencies": latencies,
+            "intervals": intervals,
+            "sizes": self.sizes,
+        }
+
+async def run_bots(url: str, count: int, duration: float, ramp: float) -> List[dict]:
+    bots = [Bot() for _ in range(count)]
+    tasks = []
+
+    for bot in bots:
+        tasks.append(asyncio.create_task(bot.run(url, duration)))
+        await asyncio.sleep(ramp)
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"bot failed: {result!r}")
+
+    return [bot.stats() for bot in bots]
+
+def run_worker(url: str, count: int, duration: float, ramp: float, results: multiprocessing.Queue):
+    results.put(asyncio.run(run_bots(url, count, duration, ramp)))
+
+async def scrape_metrics(url: str) -> Dict[str, float]:
+    metrics = {}
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"{url}/metrics") as response:
+            text = await response.text()
+
+    for line in text.splitlines():
+        match = METRIC_PATTERN.match(line)
+        if match == None:
+            continue
+
+        name, labels, value = match.groups()
+        metrics[f"{name}{{{labels}}}" if labels else name] = float(value)
+
+    return metrics
+
+async def sample_metrics(url: str, duration: float, interval: float) -> List[Dict[str, float]]:
+    samples = []
+    end_time = perf_counter() + duration
+
+    while perf_counter() < end_time:
+        await asyncio.sleep(interval)
+        try:
+            samples.append(await scrape_metrics(url))
+        except aiohttp.ClientError as error:
+            print(f"failed to scrape metrics: {error!r}")
+
+    return samples
+
+def summarize(values: List[float]) -> dict:
+    ordered = sorted(values)
+    return {
+        "mean": mean(ordered) if ordered else 0.0,
+        "p50": percentile(ordered, 0.5),
+        "p99": percentile(ordered, 0.99),
+        "max": ordered[-1] if ordered else 0.0,
+    }
+
+def build_report(args, bot_stats: List[dict], metric_samples: List[Dict[str, float]]) -> dict:
+    latencies = [value for stats in bot_stats for value in stats["latencies"]]
+    intervals = [value for stats in bot_stats for value in stats["intervals"]]
+    sizes = [value for stats in bot_stats for value in stats["sizes"]]
+
+    def server_series(name: str) -> List[float]:
+        return [sample[name] for sample in metric_samples if name in sample]
+
+    return {
+        "clients": args.clients,
+        "duration": args.duration,
+        "snapshots_received": sum(stats["snapshots"] for stats in bot_stats),
+        "client": {
+            "latency": summarize(latencies),
+            "jitter": pstdev(intervals) if len(intervals) > 1 else 0.0,
+            "interval": summarize(intervals),
+            "snapshot_bytes": summarize(sizes),
+        },
+        "server": {
+            "step_p50": summarize(server_series('seconds{name="step",quantile="0.5"}')),
+            "step_p99": summarize(server_series('seconds{name="step",quantile="0.99"}')),
+            "serialize_p99": summarize(server_series('seconds{name="serialize_world",quantile="0.99"}')),
+            "snapshot_bytes": summarize(server_series("snapshot_bytes")),
+            "entities": summarize(server_series("entities")),
+        },
+    }
+
+def print_report(report: dict):
+    client = report["client"]
+    server = report["server"]
+
+    print(f"clients: {report['clients']}, snapshots received: {report['snapshots_received']}")
+    print(f"client latency p50/p99: {client['latency']['p50'] * 1000:.2f}/{client['latency']['p99'] * 1000:.2f} ms")
+    print(f"client jitter: {client['jitter'] * 1000:.2f} ms")
+    print(f"snapshot bytes p50/max: {client['snapshot_bytes']['p50']:.0f}/{client['snapshot_bytes']['max']:.0f}")
+    print(f"server step p99 (worst window): {server['step_p99']['max'] * 1000:.2f} ms")
+    print(f"server serialize p99 (worst window): {server['serialize_p99']['max'] * 1000:.2f} ms")
+
+async def main(args):
+    loop = asyncio.get_running_loop()
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+
+    processes = []
+    per_process = [args.clients // args.processes] * args.processes
+    for index in range(args.clients % args.processes):
+        per_process[index] += 1
+
+    for count in per_process:
+        process = context.Process(target=run_worker, args=(args.url, count, args.duration, args.ramp, results))
+        process.start()
+        processes.append(process)
+
+    metric_samples = await sample_metrics(args.url, args.duration, args.metrics_interval)
+
+    bot_stats = []
+    for _ in processes:
+        bot_stats += await loop.run_in_executor(None, results.get)
+
+    for process in processes:
+        process.join()
+
+    report = build_report(args, bot_stats, metric_samples)
+    print_report(report)
+
+    with open(args.report, "w") as file:
+        json.dump(report, file, indent=4)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate socket clients against a running server")
+    parser.add_argument("--url", default=f"http://localhost:{config.server.port}")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--processes", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--ramp", type=float, default=0.01, help="seconds between client connects")
+    parser.add_argument("--metrics-interval", type=float, default=1.0)
+    parser.add_argument("--report", default="load_report.json")
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,96 @@
+import argparse
+import asyncio
+import os
+import sys
+from libs.config import Config, GameConfig
+from libs.ecs import World
+from libs.recorder import read_recording
+from game import GameInstance, world_digest
+from time import perf_counter
+
+config = Config.from_file(os.path.join(os.path.dirname(__file__), "../config.json"))
+
+class StubSocket():
+    async def emit(self, event: str, data=None, **_):
+        pass
+
+def game_config_from_header(game: dict) -> GameConfig:
+    values = {key: tuple(value) if isinstance(value, list) else value for key, value in game.items()}
+    return GameConfig(**values)
+
+async def replay(args) -> int:
+    header, ticks = read_recording(args.recording)
+
+    server_config = config.server._replace(update_rate=header.update_rate, record_path="", trace_path=args.trace or "")
+    replay_config = Config(game_config_from_header(header.game), server_config)
+
+    game_instance = GameInstance(StubSocket(), World(), replay_config, seed=header.seed)
+    # recorded connects were already admitted
+    game_instance.gate_admissions = False
+    handlers = {
+        "connect": lambda sid, _: game_instance.connect(sid, None),
+        "disconnect": lambda sid, _: game_instance.disconnect(sid),
+        "respawn": game_instance.respawn,
+        "move": game_instance.move,
+        "shoot": game_instance.shoot,
+        "split": game_instance.split,
+        "overload": lambda _, level: game_instance.overload.set_level(level),
+    }
+
+    digests = []
+    server_time = 0.0
+    tick_count = 0
+    start = perf_counter()
+
+    for delta_time, events in ticks:
+        for event, sid, argument in events:
+            handlers[event](sid, argument)
+
+        game_instance.step(delta_time)
+        server_time += delta_time
+        tick_count += 1
+
+        if args.snapshots:
+            await game_instance.snapshot(server_time)
+
+        if args.digest_every > 0 and (tick_count % args.digest_every) == 0:
+            digests.append(f"{tick_count} {world_digest(game_instance.world)}")
+
+    elapsed = perf_counter() - start
+    game_instance.tracer.close()
+    digests.append(f"{tick_count} {world_digest(game_instance.world)}")
+
+    print(f"replayed {tick_count} ticks in {elapsed:.2f}s ({tick_count / max(elapsed, 1e-9):.1f} ticks/s)")
+    print(f"final digest: {digests[-1]}")
+
+    if args.digests:
+        with open(args.digests, "w") as file:
+            file.write("\n".join(digests) + "\n")
+
+    if args.expect:
+        with open(args.expect) as file:
+            expected = file.read().split("\n")
+
+        for line, expected_line in zip(digests, expected):
+            if line != expected_line:
+                print(f"world diverged: expected '{expected_line}', got '{line}'")
+                return 1
+
+        print("world matches the expected digests")
+
+    if args.profile:
+        print(game_instance.profiler.render())
+
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded input log headlessly")
+    parser.add_argument("recording")
+    parser.add_argument("--snapshots", action="store_true", help="serialize a snapshot every tick like the live server")
+    parser.add_argument("--digest-every", type=int, default=0, help="record a world digest every N ticks")
+    parser.add_argument("--digests", help="write the world digests to this file")
+    parser.add_argument("--expect", help="compare against digests written by an earlier replay")
+    parser.add_argument("--profile", action="store_true", help="print per-system timings after the replay")
+    parser.add_argument("--trace", help="write a chrome trace of every replayed tick to this path")
+
+    sys.exit(asyncio.run(replay(parser.parse_args())))
@@ -0,0 +1,284 @@
+import socketio
+import asyncio
+import os
+import multiprocessing
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from libs.config import Config
+from libs.ecs import World
+from libs.overload import SHED_ADMISSIONS
+from game import GameInstance
+from typing import Callable, Dict, List
+
+SocketServer = socketio.AsyncServer
+
+METRICS_INTERVAL = 1.0
+# memory reports walk every archetype, so rooms send them less often than metrics
+MEMORY_REPORT_INTERVAL = 10.0
+
+# messages sent from a room process to the front end
+EMIT_MESSAGE = "emit"
+METRICS_MESSAGE = "metrics"
+MEMORY_REPORT_MESSAGE = "memory_report"
+OVERLOAD_MESSAGE = "overload"
+
+INPUT_EVENTS = ("connect", "respawn", "move", "shoot", "split")
+
+class RoomSocket():
+    connection: Connection
+
+    def __init__(self, connection: Connection) -> None:
+        self.connection = connection
+
+    async def emit(self, event: str, data=None, to=None, room=None, skip_sid=None, **_):
+        self.connection.send((EMIT_MESSAGE, event, data, to or room, skip_sid))
+
+# every process gets its own recording and trace files
+def process_config(config: Config, suffix: str) -> Config:
+    server_config = config.server
+
+    # the suffix goes before the extension, so a .gz recording stays compressed
+    if server_config.record_path:
+        base, extension = os.path.splitext(server_config.record_path)
+        server_config = server_config._replace(record_path=f"{base}.{suffix}{extension}")
+
+    if server_config.trace_path:
+        base, extension = os.path.splitext(server_config.trace_path)
+        server_config = server_config._replace(trace_path=f"{base}.{suffix}{extension}")
+
+    return config._replace(server=server_config)
+
+# adds a label to every line of a prometheus text dump
+def label_metrics(metrics: str, label: str) -> List[str]:
+    lines = []
+    for line in metrics.splitlines():
+        name, value = line.rsplit(" ", 1)
+        if name.endswith("}"):
+            name = f"{name[:-1]},{label}}}"
+        else:
+            name = f"{name}{{{label}}}"
+
+        lines.append(f"{name} {value}")
+
+    return lines
+
+def input_handlers(game_instance: GameInstance) -> Dict[str, Callable]:
+    handlers = {event: getattr(game_instance, event) for event in INPUT_EVENTS}
+    handlers["disconnect"] = lambda sid, _: game_instance.disconnect(sid)
+    return handlers
+
+async def room_main(config: Config, connection: Connection):
+    loop = asyncio.get_running_loop()
+    room_task = asyncio.current_task()
+    world = World()
+    game_instance = GameInstance(RoomSocket(connection), world, config)
+    game_instance.gate_admissions = False
+    game_instance.overload.listeners.append(lambda level: connection.send((OVERLOAD_MESSAGE, level)))
+    handlers = input_handlers(game_instance)
+
+    def receive_inputs():
+        while connection.poll():
+            try:
+                event, sid, payload = connection.recv()
+            except EOFError:
+                loop.remove_reader(connection.fileno())
+                room_task.cancel()
+                return
+
+            handlers[event](sid, payload)
+
+    async def send_metrics():
+        while True:
+            await asyncio.sleep(METRICS_INTERVAL)
+            connection.send((METRICS_MESSAGE, game_instance.profiler.render()))
+
+    async def send_memory_reports():
+        while True:
+            connection.send((MEMORY_REPORT_MESSAGE, game_instance.memory_report()))
+            await asyncio.sleep(MEMORY_REPORT_INTERVAL)
+
+    loop.add_reader(connection.fileno(), receive_inputs)
+    loop.create_task(send_metrics())
+    loop.create_task(send_memory_reports())
+    await game_instance.init_game_loop()
+
+def run_room(config: Config, connection: Connection):
+    try:
+        asyncio.run(room_main(config, connection))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+class Room():
+    id: int
+    name: str
+    capacity: int
+    sessions: set[str]
+    connection: Connection
+    process: BaseProcess
+    metrics: str
+    memory_report: dict
+    overload_level: int
+    alive: bool = True
+
+    def __init__(self, id: int, capacity: int, connection: Connection, process: BaseProcess) -> None:
+        self.id = id
+        self.name = f"room-{id}"
+        self.capacity = capacity
+        self.sessions = set()
+        self.connection = connection
+        self.process = process
+        self.metrics = ""
+        self.memory_report = {}
+        self.overload_level = 0
+
+    def is_full(self) -> bool:
+        return self.capacity > 0 and len(self.sessions) >= self.capacity
+
+    def is_admitting(self) -> bool:
+        return self.alive and not self.is_full() and self.overload_level < SHED_ADMISSIONS
+
+class RoomManager():
+    socket: SocketServer
+    rooms: List[Room]
+    rejected_sessions: int = 0
+
+    _session_rooms: Dict[str, Room]
+
+    def __init__(self, socket: SocketServer, configs: List[Config], capacity: int) -> None:
+        context = multiprocessing.get_context("spawn")
+
+        self.socket = socket
+        self.rooms = []
+        self._session_rooms = {}
+
+        for room_id, config in enumerate(configs):
+            config = process_config(config, f"room-{room_id}")
+
+            connection, room_connection = context.Pipe()
+            process = context.Process(
+                target=run_room,
+                args=(config, room_connection),
+                name=f"room-{room_id}",
+                daemon=True
+            )
+
+            self.rooms.append(Room(room_id, capacity, connection, process))
+
+    def _place(self) -> Room | None:
+        for room in self.rooms:
+            if room.is_admitting():
+                return room
+
+        return None
+
+    def _send(self, room: Room, message: tuple):
+        if not room.alive:
+            return
+
+        try:
+            room.connection.send(message)
+        except OSError:
+            self._drop(room)
+
+    # the players go down with the room, disconnecting them sends them back to the start menu to join a live one
+    def _drop(self, room: Room):
+        if not room.alive:
+            return
+
+        print(f"{room.name} exited, dropping it")
+        room.alive = False
+        room.overload_level = 0
+        asyncio.get_running_loop().remove_reader(room.connection.fileno())
+
+        for sid in room.sessions:
+            self._session_rooms.pop(sid, None)
+            asyncio.ensure_future(self.socket.disconnect(sid))
+        room.sessions.clear()
+
+    def _forward(self, sid: str, event: str, payload):
+        room = self._session_rooms.get(sid)
+        if room == None:
+            return
+
+        self._send(room, (event, sid, payload))
+
+    def _relay(self, room: Room):
+        socket = self.socket
+        connection = room.connection
+
+        while connection.poll():
+            try:
+                message = connection.recv()
+            except (EOFError, OSError):
+                self._drop(room)
+                return
+
+            if message[0] == METRICS_MESSAGE:
+                room.metrics = message[1]
+                continue
+            elif message[0] == MEMORY_REPORT_MESSAGE:
+                room.memory_report = message[1]
+                continue
+            elif message[0] == OVERLOAD_MESSAGE:
+                room.overload_level = message[1]
+                continue
+
+            _, event, data, to, skip_sid = message
+            asyncio.ensure_future(socket.emit(event, data, to=to or room.name, skip_sid=skip_sid))
+
+    def connect(self, sid: str, environ) -> bool:
+        room = self._place()
+        if room == None:
+            print(f"{sid} rejected, every room is full or shedding load")
+            self.rejected_sessions += 1
+            return False
+
+        room.sessions.add(sid)
+        self._session_rooms[sid] = room
+        asyncio.ensure_future(self.socket.enter_room(sid, room.name))
+        self._forward(sid, "connect", None)
+
+        return True
+
+    def disconnect(self, sid: str):
+        self._forward(sid, "disconnect", None)
+
+        room = self._session_rooms.pop(sid, None)
+        if room != None:
+            room.sessions.discard(sid)
+
+    def respawn(self, sid: str, name: str):
+        self._forward(sid, "respawn", name)
+
+    def move(self, sid: str, target_point: tuple[float, float]):
+        self._forward(sid, "move", target_point)
+
+    def shoot(self, sid: str, target_point: tuple[float, float]):
+        self._forward(sid, "shoot", target_point)
+
+    def split(self, sid: str, target_point: tuple[float, float]):
+        self._forward(sid, "split", target_point)
+
+    def render_metrics(self) -> str:
+        lines = [f"glob_rejected_sessions_total {self.rejected_sessions}"]
+        for room in self.rooms:
+            lines.append(f"glob_room_sessions{{room=\"{room.id}\"}} {len(room.sessions)}")
+            lines.append(f"glob_room_alive{{room=\"{room.id}\"}} {int(room.alive)}")
+            lines.extend(label_metrics(room.metrics, f'room="{room.id}"'))
+
+        lines.append("")
+        return "\n".join(lines)
+
+    def memory_report(self) -> dict:
+        return {room.name: room.memory_report for room in self.rooms}
+
+    async def init_game_loop(self):
+        loop = asyncio.get_running_loop()
+
+        for room in self.rooms:
+            room.process.start()
+            loop.add_reader(room.connection.fileno(), self._relay, room)
+
+        await asyncio.gather(*[
+            loop.run_in_executor(None, room.process.join) for room in self.rooms
+        ])
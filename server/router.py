@@ -1,5 +1,8 @@
 import os
-from aiohttp import web
+import json
+from aiohttp import web, hdrs
+from libs.asset_cache import AssetCache
+from typing import Callable
 
 SERVER_DIRECTORY = os.path.abspath(os.path.dirname(__file__))
 PUBLIC_DIRECTORY = os.path.join(SERVER_DIRECTORY, "../public")
@@ -8,23 +11,55 @@ CONTENT_TYPES = {
     ".mp3": "audio/mpeg",
     ".css": "text/css",
     ".html": "text/html",
-    ".js": "application/javascript"
+    ".js": "application/javascript",
+    ".png": "image/png"
 }
 
+METRICS_KEY = web.AppKey("metrics", Callable[[], str])
+MEMORY_REPORT_KEY = web.AppKey("memory_report", Callable[[], dict])
+
+assets = AssetCache(PUBLIC_DIRECTORY, CONTENT_TYPES, "text/html")
+
+# on_startup hook, so the first players don't wait on the disk
+async def preload_assets(app: web.Application):
+    await assets.preload()
+
+async def metrics(request: web.Request):
+    render_metrics = request.app[METRICS_KEY]
+    return web.Response(text=render_metrics(), content_type="text/plain")
+
+async def memory_report(request: web.Request):
+    report = request.app[MEMORY_REPORT_KEY]
+    return web.json_response(report(), dumps=lambda data: json.dumps(data, indent=4))
+
 async def route(request: web.Request):
     path = request.match_info.get("name", "index.html")
     if path == "":
         path = "index.html"
 
-    file_path = os.path.join(PUBLIC_DIRECTORY, path)
-
-    try:
-        contents = open(file_path, mode="b+r").read()
-    except:
+    asset = await assets.get(path)
+    if asset == None:
         return web.Response(status=404)
-    
-    extension = os.path.splitext(file_path)[1]
-    content_type = CONTENT_TYPES.get(extension, "text/html")
-    
-    return web.Response(body=contents,content_type=content_type)
 
+    encoding, body = asset.select(request.headers.get(hdrs.ACCEPT_ENCODING, ""))
+    headers = {
+        hdrs.ETAG: asset.etag_for(encoding),
+        hdrs.LAST_MODIFIED: asset.last_modified,
+        hdrs.CACHE_CONTROL: asset.cache_control,
+        hdrs.VARY: hdrs.ACCEPT_ENCODING,
+    }
+
+    if_none_match = request.headers.get(hdrs.IF_NONE_MATCH)
+    if_modified_since = request.if_modified_since
+    if if_none_match != None:
+        not_modified = asset.matches(if_none_match)
+    else:
+        not_modified = if_modified_since != None and not asset.modified_since(if_modified_since.timestamp())
+
+    if not_modified:
+        return web.Response(status=304, headers=headers)
+
+    if encoding != "identity":
+        headers[hdrs.CONTENT_ENCODING] = encoding
+
+    return web.Response(body=body, content_type=asset.content_type, headers=headers)
@@ -4,8 +4,12 @@ import os
 from libs.config import Config
 from libs.ecs import World
 from aiohttp import web
-from router import route
+from router import route, metrics, memory_report, preload_assets, METRICS_KEY, MEMORY_REPORT_KEY
 from game import GameInstance
+from rooms import RoomManager
+from simulation import SimulationProcess
+from tiles import TileCoordinator
+from spectators import SpectatorBroadcaster, PLAYER_ROOM
 
 config = Config.from_file(os.path.join(os.path.dirname(__file__), "../config.json"))
 
@@ -13,29 +17,67 @@ async def main():
     sio = socketio.AsyncServer()
     app = web.Application()
     sio.attach(app)
+
+    server_config = config.server
+    if server_config.rooms > 1:
+        game_instance = RoomManager(sio, [config] * server_config.rooms, server_config.room_capacity)
+        app[METRICS_KEY] = game_instance.render_metrics
+        app[MEMORY_REPORT_KEY] = game_instance.memory_report
+    elif server_config.tile_columns * server_config.tile_rows > 1:
+        game_instance = TileCoordinator(sio, config)
+        app[METRICS_KEY] = game_instance.render_metrics
+        app[MEMORY_REPORT_KEY] = game_instance.memory_report
+    elif server_config.simulation_process:
+        game_instance = SimulationProcess(sio, config)
+        app[METRICS_KEY] = game_instance.render_metrics
+        app[MEMORY_REPORT_KEY] = game_instance.memory_report
+    else:
+        world = World()
+        game_instance = GameInstance(sio, world, config)
+        app[METRICS_KEY] = game_instance.profiler.render
+        app[MEMORY_REPORT_KEY] = game_instance.memory_report
+
+    # rooms already split sessions between processes, the spectator tier sits in front of a single game
+    spectators = None
+    if server_config.spectator_snapshot_rate > 0 and server_config.rooms <= 1:
+        spectators = SpectatorBroadcaster(sio, server_config.spectator_snapshot_rate)
+        game_instance.snapshot_room = PLAYER_ROOM
+        game_instance.snapshot_listeners.append(spectators.publish)
+
+        render_game_metrics = app[METRICS_KEY]
+        app[METRICS_KEY] = lambda: render_game_metrics() + spectators.render_metrics()
+
+    app.router.add_get("/metrics", metrics)
+    app.router.add_get("/debug/memory", memory_report)
     app.router.add_get(r"/{name:.*}", route)
+    app.on_startup.append(preload_assets)
 
     runner = web.AppRunner(app)
     await runner.setup()
     site = web.TCPSite(runner, config.server.hostname, config.server.port)
     await site.start()
 
-    world = World()
-    game_instance = GameInstance(sio, world, config)
-
     @sio.event
-    def connect(sid, environ):
+    async def connect(sid, environ):
         print(f"connect {sid}")
-        game_instance.connect(sid, environ)
+        accepted = game_instance.connect(sid, environ)
+        if spectators != None and accepted != False:
+            await spectators.connect(sid)
+
+        return accepted
 
     @sio.event
     def disconnect(sid):
         print(f"disconnect {sid}")
         game_instance.disconnect(sid)
+        if spectators != None:
+            spectators.disconnect(sid)
 
     @sio.event
-    def respawn(sid, name):
+    async def respawn(sid, name):
         game_instance.respawn(sid, name)
+        if spectators != None:
+            await spectators.promote(sid)
 
     @sio.event
     def move(sid, direction):
@@ -49,8 +91,10 @@ async def main():
     def split(sid, direction):
         game_instance.split(sid, direction)
 
+    if spectators != None:
+        asyncio.get_running_loop().create_task(spectators.run())
+
     await game_instance.init_game_loop()
 
 if __name__ == "__main__":
     asyncio.run(main())
-
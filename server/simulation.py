@@ -0,0 +1,266 @@
+import socketio
+import asyncio
+import json
+import os
+import struct
+import multiprocessing
+from array import array
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from libs.config import Config
+from libs.ecs import World
+from libs.shared_ring import SharedRing
+from libs.overload import SHED_ADMISSIONS
+from game import GameInstance
+from rooms import input_handlers
+from typing import Callable, List
+
+SocketServer = socketio.AsyncServer
+
+SNAPSHOT_RING_CAPACITY = 16 * 1024 * 1024
+INPUT_RING_CAPACITY = 1024 * 1024
+METRICS_INTERVAL = 1.0
+MEMORY_REPORT_INTERVAL = 10.0
+DOORBELL = b"\0"
+
+# first byte of every message in the snapshot ring
+SNAPSHOT_MESSAGE = b"S"
+EMIT_MESSAGE = b"E"
+METRICS_MESSAGE = b"M"
+MEMORY_REPORT_MESSAGE = b"R"
+OVERLOAD_MESSAGE = b"O"
+
+# server time, glob count, encoded players length
+SNAPSHOT_HEADER = struct.Struct("<dII")
+
+# the players section also carries the sessions that got their own culled snapshot
+def encode_world_state(world_state: list, skip_sid: List[str] | None = None) -> bytes:
+    server_time, players, globs = world_state
+    encoded_players = json.dumps([players, skip_sid or []]).encode()
+
+    ids = array("q")
+    player_indices = array("i")
+    values = array("d")
+
+    for entity, mass, position, player_index in globs:
+        ids.append(entity)
+        player_indices.append(player_index)
+        values.extend((mass, position[0], position[1]))
+
+    return b"".join((
+        SNAPSHOT_MESSAGE,
+        SNAPSHOT_HEADER.pack(server_time, len(globs), len(encoded_players)),
+        encoded_players,
+        ids.tobytes(),
+        player_indices.tobytes(),
+        values.tobytes()
+    ))
+
+def decode_world_state(payload: bytes) -> tuple[list, List[str]]:
+    server_time, count, players_length = SNAPSHOT_HEADER.unpack_from(payload, 1)
+    offset = 1 + SNAPSHOT_HEADER.size
+
+    players, skip_sid = json.loads(payload[offset:offset + players_length])
+    offset += players_length
+
+    ids = array("q")
+    ids.frombytes(payload[offset:offset + count * ids.itemsize])
+    offset += count * ids.itemsize
+
+    player_indices = array("i")
+    player_indices.frombytes(payload[offset:offset + count * player_indices.itemsize])
+    offset += count * player_indices.itemsize
+
+    values = array("d")
+    values.frombytes(payload[offset:offset + count * 3 * values.itemsize])
+
+    globs = []
+    for index in range(count):
+        value_index = index * 3
+        position = (values[value_index + 1], values[value_index + 2])
+        globs.append((ids[index], values[value_index], position, player_indices[index]))
+
+    return [server_time, players, globs], skip_sid
+
+class RingSocket():
+    ring: SharedRing
+    doorbell: int
+    dropped: int = 0
+
+    def __init__(self, ring: SharedRing, doorbell: int) -> None:
+        self.ring = ring
+        self.doorbell = doorbell
+
+    def ring_doorbell(self):
+        try:
+            os.write(self.doorbell, DOORBELL)
+        except BlockingIOError:
+            pass
+
+    def push(self, payload: bytes):
+        if not self.ring.push(payload):
+            self.dropped += 1
+            return
+
+        self.ring_doorbell()
+
+    async def emit(self, event: str, data=None, to=None, room=None, skip_sid=None, **_):
+        to = to or room
+        if event == "snapshot" and to == None:
+            self.push(encode_world_state(data, skip_sid))
+        else:
+            self.push(EMIT_MESSAGE + json.dumps([event, data, to]).encode())
+
+async def simulation_main(config: Config, snapshot_ring_name: str, input_ring_name: str, doorbell: Connection):
+    snapshot_ring = SharedRing.attach(snapshot_ring_name)
+    input_ring = SharedRing.attach(input_ring_name)
+    os.set_blocking(doorbell.fileno(), False)
+
+    socket = RingSocket(snapshot_ring, doorbell.fileno())
+    game_instance = GameInstance(socket, World(), config)
+    game_instance.gate_admissions = False
+    game_instance.overload.listeners.append(lambda level: socket.push(OVERLOAD_MESSAGE + str(level).encode()))
+    handlers = input_handlers(game_instance)
+
+    def drain_inputs():
+        payload = input_ring.pop()
+        while payload != None:
+            event, sid, argument = json.loads(payload)
+            handlers[event](sid, argument)
+            payload = input_ring.pop()
+
+    async def send_metrics():
+        profiler = game_instance.profiler
+        while True:
+            await asyncio.sleep(METRICS_INTERVAL)
+            profiler.gauge("dropped_ring_messages", socket.dropped)
+            socket.push(METRICS_MESSAGE + profiler.render().encode())
+
+    async def send_memory_reports():
+        while True:
+            socket.push(MEMORY_REPORT_MESSAGE + json.dumps(game_instance.memory_report()).encode())
+            await asyncio.sleep(MEMORY_REPORT_INTERVAL)
+
+    game_instance.tick_callbacks.append(drain_inputs)
+    asyncio.get_running_loop().create_task(send_metrics())
+    asyncio.get_running_loop().create_task(send_memory_reports())
+    await game_instance.init_game_loop()
+
+def run_simulation(config: Config, snapshot_ring_name: str, input_ring_name: str, doorbell: Connection):
+    try:
+        asyncio.run(simulation_main(config, snapshot_ring_name, input_ring_name, doorbell))
+    except KeyboardInterrupt:
+        pass
+
+class SimulationProcess():
+    socket: SocketServer
+    metrics: str
+    last_memory_report: dict
+    snapshot_room: str | None
+    snapshot_listeners: List[Callable[[list], None]]
+    overload_level: int = 0
+    rejected_sessions: int = 0
+
+    _snapshot_ring: SharedRing
+    _input_ring: SharedRing
+    _doorbell: Connection
+    _process: BaseProcess
+
+    def __init__(self, socket: SocketServer, config: Config) -> None:
+        context = multiprocessing.get_context("spawn")
+        doorbell, simulation_doorbell = context.Pipe(duplex=False)
+
+        self.socket = socket
+        self.metrics = ""
+        self.last_memory_report = {}
+        self.snapshot_room = None
+        self.snapshot_listeners = []
+
+        self._snapshot_ring = SharedRing.create(SNAPSHOT_RING_CAPACITY)
+        self._input_ring = SharedRing.create(INPUT_RING_CAPACITY)
+        self._doorbell = doorbell
+        self._process = context.Process(
+            target=run_simulation,
+            args=(config, self._snapshot_ring.name, self._input_ring.name, simulation_doorbell),
+            name="simulation",
+            daemon=True
+        )
+
+    def _push(self, event: str, sid: str, argument):
+        payload = json.dumps([event, sid, argument]).encode()
+        if not self._input_ring.push(payload):
+            print(f"dropped {event} from {sid}, input ring is full")
+
+    def _drain(self):
+        socket = self.socket
+        ring = self._snapshot_ring
+
+        try:
+            os.read(self._doorbell.fileno(), 4096)
+        except BlockingIOError:
+            pass
+
+        payload = ring.pop()
+        while payload != None:
+            kind = payload[:1]
+            if kind == SNAPSHOT_MESSAGE:
+                world_state, skip_sid = decode_world_state(payload)
+                asyncio.ensure_future(socket.emit("snapshot", world_state, to=self.snapshot_room, skip_sid=skip_sid or None))
+                for listener in self.snapshot_listeners:
+                    listener(world_state)
+            elif kind == EMIT_MESSAGE:
+                event, data, to = json.loads(payload[1:])
+                asyncio.ensure_future(socket.emit(event, data, to=to))
+            elif kind == METRICS_MESSAGE:
+                self.metrics = payload[1:].decode()
+            elif kind == MEMORY_REPORT_MESSAGE:
+                self.last_memory_report = json.loads(payload[1:])
+            elif kind == OVERLOAD_MESSAGE:
+                self.overload_level = int(payload[1:])
+
+            payload = ring.pop()
+
+    def connect(self, sid: str, environ) -> bool:
+        if self.overload_level >= SHED_ADMISSIONS:
+            self.rejected_sessions += 1
+            return False
+
+        self._push("connect", sid, None)
+        return True
+
+    def disconnect(self, sid: str):
+        self._push("disconnect", sid, None)
+
+    def respawn(self, sid: str, name: str):
+        self._push("respawn", sid, name)
+
+    def move(self, sid: str, target_point: tuple[float, float]):
+        self._push("move", sid, target_point)
+
+    def shoot(self, sid: str, target_point: tuple[float, float]):
+        self._push("shoot", sid, target_point)
+
+    def split(self, sid: str, target_point: tuple[float, float]):
+        self._push("split", sid, target_point)
+
+    def render_metrics(self) -> str:
+        return f"glob_rejected_sessions_total {self.rejected_sessions}\n{self.metrics}"
+
+    def memory_report(self) -> dict:
+        return self.last_memory_report
+
+    async def init_game_loop(self):
+        loop = asyncio.get_running_loop()
+        doorbell = self._doorbell.fileno()
+
+        self._process.start()
+        os.set_blocking(doorbell, False)
+        loop.add_reader(doorbell, self._drain)
+
+        try:
+            await loop.run_in_executor(None, self._process.join)
+        finally:
+            loop.remove_reader(doorbell)
+            for ring in (self._snapshot_ring, self._input_ring):
+                ring.close()
+                ring.unlink()
@@ -0,0 +1,71 @@
+import socketio
+import asyncio
+from time import perf_counter
+from typing import Set
+
+SocketServer = socketio.AsyncServer
+
+# everyone starts out watching, respawning moves a session to the player room
+SPECTATOR_ROOM = "spectators"
+PLAYER_ROOM = "players"
+
+# serves connections that never respawned from the latest snapshot the game published.
+# the game loop only swaps a reference, the fan-out runs on its own task and rate,
+# and a slow broadcast just skips the snapshots that were replaced in the meantime
+class SpectatorBroadcaster():
+    socket: SocketServer
+    interval: float
+    spectators: Set[str]
+
+    broadcasts: int = 0
+    last_broadcast: float = 0.0
+
+    _latest: list | None = None
+
+    def __init__(self, socket: SocketServer, snapshot_rate: float) -> None:
+        self.socket = socket
+        self.interval = 1 / snapshot_rate
+        self.spectators = set()
+
+    async def connect(self, sid: str):
+        self.spectators.add(sid)
+        await self.socket.enter_room(sid, SPECTATOR_ROOM)
+
+    async def promote(self, sid: str):
+        if not sid in self.spectators:
+            return
+
+        self.spectators.discard(sid)
+        await self.socket.leave_room(sid, SPECTATOR_ROOM)
+        await self.socket.enter_room(sid, PLAYER_ROOM)
+
+    def disconnect(self, sid: str):
+        self.spectators.discard(sid)
+
+    def publish(self, world_state: list):
+        self._latest = world_state
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+
+            world_state = self._latest
+            if world_state == None or len(self.spectators) == 0:
+                continue
+
+            self._latest = None
+
+            start = perf_counter()
+            await self.socket.emit("snapshot", world_state, to=SPECTATOR_ROOM)
+            self.last_broadcast = perf_counter() - start
+            self.broadcasts += 1
+
+    def render_metrics(self) -> str:
+        lines = [
+            f"glob_spectators {len(self.spectators)}",
+            f"glob_spectator_broadcast_seconds {self.last_broadcast:.9f}",
+            f"glob_spectator_broadcasts_total {self.broadcasts}",
+            "",
+        ]
+
+        return "\n".join(lines)
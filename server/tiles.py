@@ -0,0 +1,695 @@
+import socketio
+import asyncio
+import multiprocessing
+from bisect import bisect_right
+from time import time
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from libs.config import Config, GameConfig
+from libs.ecs import World, Id, Query, component
+from libs.vector import Vector
+from libs.overload import SHED_ADMISSIONS
+from game import (
+    GameInstance, Mass, Position, Velocity, MoveDirection, MergeDebounce, Parent, Session, Name,
+    Food, Player, Virus, Ghost, GhostClaims, Timers, SpatialIndexSingleton,
+    assert_get, set_mass, delete_glob, consume_food, spawn_player, spawn_ejected_mass, expire_merge_debounce
+)
+from rooms import (
+    process_config, input_handlers, label_metrics,
+    EMIT_MESSAGE, METRICS_MESSAGE, MEMORY_REPORT_MESSAGE, OVERLOAD_MESSAGE, METRICS_INTERVAL, MEMORY_REPORT_INTERVAL
+)
+from typing import Callable, Dict, List, NamedTuple, Set, Tuple
+
+SocketServer = socketio.AsyncServer
+
+# one map split into a grid of tiles, each owned by a process with its own World.
+# globs that move out of a tile are handed off to the tile they moved into, globs near
+# a border are mirrored into the neighbouring tiles as ghosts so cells can eat across it,
+# and the coordinator relays between tiles and merges their snapshots into one view
+
+# messages a tile sends to the coordinator, next to the room ones
+SNAPSHOT_MESSAGE = "snapshot"
+ROUTE_MESSAGE = "route"
+
+# messages a tile receives
+INPUT_MESSAGE = "input"
+HANDOFF_MESSAGE = "handoff"
+GHOST_MESSAGE = "ghosts"
+CLAIM_MESSAGE = "claims"
+CREDIT_MESSAGE = "credits"
+
+# globs keep the id they were first snapshotted with when they change tiles
+GlobalId = component(int, sparse=True)
+
+Bounds = Tuple[float, float, float, float]
+
+class TileLayout(NamedTuple):
+    columns: int
+    rows: int
+    x_edges: List[int]
+    y_edges: List[int]
+
+    def bounds(self, tile_id: int) -> Bounds:
+        row, column = divmod(tile_id, self.columns)
+        return (self.x_edges[column], self.y_edges[row], self.x_edges[column + 1], self.y_edges[row + 1])
+
+    # positions on the far edge of the map belong to the last tile
+    def tile_at(self, x: float, y: float) -> int:
+        column = min(max(bisect_right(self.x_edges, x) - 1, 0), self.columns - 1)
+        row = min(max(bisect_right(self.y_edges, y) - 1, 0), self.rows - 1)
+        return row * self.columns + column
+
+    def __len__(self) -> int:
+        return self.columns * self.rows
+
+def tile_layout(config: GameConfig, columns: int, rows: int) -> TileLayout:
+    half_width = config.width // 2
+    half_height = config.height // 2
+
+    return TileLayout(
+        columns, rows,
+        [-half_width + (config.width * column) // columns for column in range(columns + 1)],
+        [-half_height + (config.height * row) // rows for row in range(rows + 1)]
+    )
+
+def intersect(a: Bounds, b: Bounds) -> Bounds | None:
+    min_x, min_y = max(a[0], b[0]), max(a[1], b[1])
+    max_x, max_y = min(a[2], b[2]), min(a[3], b[3])
+    if min_x >= max_x or min_y >= max_y:
+        return None
+
+    return (min_x, min_y, max_x, max_y)
+
+def tile_config(config: Config, layout: TileLayout, tile_id: int) -> Config:
+    game_config = config.game
+    count = len(layout)
+
+    def share(total: int) -> int:
+        return total * (tile_id + 1) // count - total * tile_id // count
+
+    game_config = game_config._replace(
+        spawn_area=layout.bounds(tile_id),
+        maximum_food=share(game_config.maximum_food),
+        maximum_viruses=share(game_config.maximum_viruses)
+    )
+
+    # the coordinator merges whole tiles, so snapshots can't be culled per session
+    server_config = config.server._replace(interest_radius=0, overload_interest_radius=0, overload_bandwidth=0)
+
+    return process_config(config._replace(game=game_config, server=server_config), f"tile-{tile_id}")
+
+class TileSocket():
+    connection: Connection
+    worker: "TileWorker"
+
+    def __init__(self, connection: Connection, worker: "TileWorker") -> None:
+        self.connection = connection
+        self.worker = worker
+
+    async def emit(self, event: str, data=None, to=None, room=None, **_):
+        if event == "snapshot":
+            self.connection.send((SNAPSHOT_MESSAGE, self.worker.owned_world_state(data)))
+        else:
+            self.connection.send((EMIT_MESSAGE, event, data, to or room))
+
+class TileWorker():
+    tile_id: int
+    layout: TileLayout
+    bounds: Bounds
+    connection: Connection
+    game_instance: GameInstance
+    world: World
+    # neighbour -> the strip of this tile mirrored into it
+    mirrors: Dict[int, Bounds]
+
+    # neighbour -> entity -> the state it last got
+    _mirrored: Dict[int, Dict[Id, tuple]]
+    # (owner tile, owner entity) <-> local ghost
+    _ghosts: Dict[Tuple[int, Id], Id]
+    _ghost_owners: Dict[Id, Tuple[int, Id]]
+    _handlers: Dict[str, Callable]
+
+    def __init__(self, config: Config, tile_id: int, layout: TileLayout, connection: Connection) -> None:
+        self.tile_id = tile_id
+        self.layout = layout
+        self.bounds = layout.bounds(tile_id)
+        self.connection = connection
+        self.mirrors = {}
+
+        self._mirrored = {}
+        self._ghosts = {}
+        self._ghost_owners = {}
+
+        margin = config.server.tile_ghost_margin
+        for other_id in range(len(layout)):
+            if other_id == tile_id:
+                continue
+
+            min_x, min_y, max_x, max_y = layout.bounds(other_id)
+            strip = intersect(self.bounds, (min_x - margin, min_y - margin, max_x + margin, max_y + margin))
+            if strip != None:
+                self.mirrors[other_id] = strip
+                self._mirrored[other_id] = {}
+
+        self.game_instance = GameInstance(TileSocket(connection, self), World(), config)
+        self.world = self.game_instance.world
+        self.game_instance.tick_callbacks.append(self.publish)
+        self.game_instance.gate_admissions = False
+        self.game_instance.overload.listeners.append(lambda level: connection.send((OVERLOAD_MESSAGE, level)))
+
+        self._handlers = input_handlers(self.game_instance)
+
+    def global_id(self, entity: Id) -> int:
+        global_id = self.world.get(entity, GlobalId)
+        if global_id != None:
+            return global_id
+
+        return entity * len(self.layout) + self.tile_id
+
+    # ghosts show up in the owner's snapshot, local ids become global ones
+    def owned_world_state(self, world_state: list) -> list:
+        world = self.world
+        server_time, players, globs = world_state
+
+        owned_globs = []
+        for entity, mass, position, player_index in globs:
+            if world.has(entity, Ghost):
+                continue
+
+            owned_globs.append((self.global_id(entity), mass, position, player_index))
+
+        return [server_time, players, owned_globs]
+
+    def route(self, destination: int, message: tuple):
+        self.connection.send((ROUTE_MESSAGE, destination, message))
+
+    def receive(self, message: tuple):
+        kind = message[0]
+        if kind == INPUT_MESSAGE:
+            _, event, sid, payload = message
+            self._handlers[event](sid, payload)
+        elif kind == HANDOFF_MESSAGE:
+            self.receive_handoffs(message[1])
+        elif kind == GHOST_MESSAGE:
+            self.receive_ghosts(message[1], message[2], message[3])
+        elif kind == CLAIM_MESSAGE:
+            self.receive_claims(message[1], message[2])
+        elif kind == CREDIT_MESSAGE:
+            self.receive_credits(message[1])
+
+    # runs before every batch of steps, everything it sends reflects the last one
+    def publish(self):
+        self.hand_off()
+        self.mirror()
+        self.send_claims()
+
+    def hand_off(self):
+        world = self.world
+        layout = self.layout
+        tile_id = self.tile_id
+
+        leaving = []
+        for entity, position, _ in Query(world, Position, Velocity):
+            destination = layout.tile_at(position.x, position.y)
+            if destination != tile_id:
+                leaving.append((entity, destination))
+
+        if len(leaving) == 0:
+            return
+
+        timers = assert_get(world, Timers, Timers)
+        handoffs: Dict[int, list] = {}
+
+        for entity, destination in leaving:
+            mass = assert_get(world, entity, Mass)
+            position = assert_get(world, entity, Position)
+            velocity = assert_get(world, entity, Velocity)
+            global_id = self.global_id(entity)
+
+            parent = world.get(entity, Parent)
+            if parent != None:
+                direction = world.get(entity, MoveDirection) or Vector()
+                deadline = world.get(entity, MergeDebounce)
+                remaining = (deadline - timers.tick) if deadline != None else 0
+                entry = (
+                    global_id, world.get(parent, Session), world.get(parent, Name), mass,
+                    position.x, position.y, velocity.x, velocity.y, direction.x, direction.y, remaining
+                )
+                delete_glob(world, entity)
+            else:
+                entry = (global_id, None, None, mass, position.x, position.y, velocity.x, velocity.y, 0.0, 0.0, 0)
+                world.delete(entity)
+
+            handoffs.setdefault(destination, []).append(entry)
+
+        for destination, entries in handoffs.items():
+            self.route(destination, (HANDOFF_MESSAGE, entries))
+
+    def receive_handoffs(self, entries: List[tuple]):
+        world = self.world
+        game_instance = self.game_instance
+        timers = assert_get(world, Timers, Timers)
+
+        for global_id, sid, name, mass, x, y, velocity_x, velocity_y, direction_x, direction_y, remaining in entries:
+            position = Vector(x, y)
+            velocity = Vector(velocity_x, velocity_y)
+
+            if sid == None:
+                entity = spawn_ejected_mass(world, mass, position, velocity)
+            else:
+                parent = game_instance.session_parent(sid)
+                if name != None:
+                    world.set(parent, Name, name)
+
+                entity = spawn_player(world, parent, mass, position)
+                world.set(entity, Velocity, velocity)
+                world.set(entity, MoveDirection, Vector(direction_x, direction_y))
+
+                if remaining > 0:
+                    deadline = timers.tick + remaining
+                    world.set(entity, MergeDebounce, deadline)
+                    timers.schedule_at(deadline, expire_merge_debounce, world, entity, deadline)
+
+            world.set(entity, GlobalId, global_id)
+
+    # sends each neighbour what changed in the strip it mirrors, viruses never move so they stay home
+    def mirror(self):
+        world = self.world
+        spatial_index = assert_get(world, SpatialIndexSingleton, SpatialIndexSingleton)
+
+        for neighbour, (min_x, min_y, max_x, max_y) in self.mirrors.items():
+            mirrored = self._mirrored[neighbour]
+            current = {}
+            upserts = []
+
+            for entity in spatial_index.query_rect(min_x, min_y, max_x, max_y):
+                if world.has(entity, Ghost) or world.has(entity, Virus):
+                    continue
+
+                parent = world.get(entity, Parent)
+                if parent != None:
+                    session = world.get(parent, Session)
+                elif world.has(entity, Food):
+                    session = ""
+                else:
+                    continue
+
+                position = assert_get(world, entity, Position)
+                state = (session, assert_get(world, entity, Mass), position.x, position.y)
+                current[entity] = state
+                if mirrored.get(entity) != state:
+                    upserts.append((entity, *state))
+
+            removals = [entity for entity in mirrored if not entity in current]
+            self._mirrored[neighbour] = current
+
+            if len(upserts) > 0 or len(removals) > 0:
+                self.route(neighbour, (GHOST_MESSAGE, self.tile_id, upserts, removals))
+
+    def receive_ghosts(self, owner: int, upserts: List[tuple], removals: List[Id]):
+        world = self.world
+        ghosts = self._ghosts
+        ghost_owners = self._ghost_owners
+
+        for remote, session, mass, x, y in upserts:
+            key = (owner, remote)
+            ghost = ghosts.get(key)
+            if ghost != None and world.contains(ghost):
+                world.set(ghost, Mass, mass)
+                world.set(ghost, Position, Vector(x, y))
+                continue
+
+            ghost = world.spawn_batch(
+                [Mass, Position, Player if session else Food, Ghost], [mass], [Vector(x, y)], [session]
+            )[0]
+            ghosts[key] = ghost
+            ghost_owners[ghost] = key
+
+        for remote in removals:
+            ghost = ghosts.pop((owner, remote), None)
+            if ghost != None:
+                ghost_owners.pop(ghost, None)
+                world.delete(ghost)
+
+    def send_claims(self):
+        claims = assert_get(self.world, GhostClaims, GhostClaims)
+        if len(claims) == 0:
+            return
+
+        ghosts = self._ghosts
+        outgoing: Dict[int, list] = {}
+
+        for eater, eater_mass, ghost in claims:
+            key = self._ghost_owners.pop(ghost, None)
+            if key == None:
+                continue
+
+            if ghosts.get(key) == ghost:
+                del ghosts[key]
+
+            owner, remote = key
+            outgoing.setdefault(owner, []).append((remote, eater, eater_mass))
+
+        claims.clear()
+        for owner, entries in outgoing.items():
+            self.route(owner, (CLAIM_MESSAGE, self.tile_id, entries))
+
+    # the owner has the real glob, so the first claim for it wins and later ones find nothing
+    def receive_claims(self, claimer: int, entries: List[tuple]):
+        world = self.world
+
+        credits = []
+        for victim, eater, eater_mass in entries:
+            mass = world.get(victim, Mass)
+            if mass == None or not world.has(victim, Position) or world.has(victim, Ghost):
+                continue
+
+            if world.has(victim, Food):
+                consume_food(world, victim)
+            elif world.has(victim, Player) and mass < eater_mass:
+                delete_glob(world, victim)
+            else:
+                continue
+
+            credits.append((eater, mass))
+
+        if len(credits) > 0:
+            self.route(claimer, (CREDIT_MESSAGE, credits))
+
+    # an eater that was eaten or handed off since its claim loses the credit
+    def receive_credits(self, entries: List[tuple]):
+        world = self.world
+        for eater, mass in entries:
+            eater_mass = world.get(eater, Mass)
+            if eater_mass == None or world.has(eater, Ghost):
+                continue
+
+            set_mass(world, eater, eater_mass + mass)
+
+async def tile_main(config: Config, tile_id: int, layout: TileLayout, connection: Connection):
+    loop = asyncio.get_running_loop()
+    tile_task = asyncio.current_task()
+    worker = TileWorker(config, tile_id, layout, connection)
+    game_instance = worker.game_instance
+
+    def receive_messages():
+        while connection.poll():
+            try:
+                message = connection.recv()
+            except EOFError:
+                loop.remove_reader(connection.fileno())
+                tile_task.cancel()
+                return
+
+            worker.receive(message)
+
+    async def send_metrics():
+        while True:
+            await asyncio.sleep(METRICS_INTERVAL)
+            connection.send((METRICS_MESSAGE, game_instance.profiler.render()))
+
+    async def send_memory_reports():
+        while True:
+            connection.send((MEMORY_REPORT_MESSAGE, game_instance.memory_report()))
+            await asyncio.sleep(MEMORY_REPORT_INTERVAL)
+
+    loop.add_reader(connection.fileno(), receive_messages)
+    loop.create_task(send_metrics())
+    loop.create_task(send_memory_reports())
+    await game_instance.init_game_loop()
+
+def run_tile(config: Config, tile_id: int, layout: TileLayout, connection: Connection):
+    try:
+        asyncio.run(tile_main(config, tile_id, layout, connection))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+def merge_world_states(server_time: float, world_states: List[list]) -> list:
+    players = []
+    globs = []
+    player_indices: Dict[str, int] = {}
+
+    for _, tile_players, tile_globs in world_states:
+        remapped = []
+        for name, session in tile_players:
+            player_index = player_indices.get(session)
+            if player_index == None:
+                player_index = len(players)
+                player_indices[session] = player_index
+                players.append((name, session))
+
+            remapped.append(player_index)
+
+        for entity, mass, position, player_index in tile_globs:
+            if player_index >= 0:
+                player_index = remapped[player_index]
+
+            globs.append((entity, mass, position, player_index))
+
+    return [server_time, players, globs]
+
+# tiles only rank the cells they own, a player spread over several tiles adds up here
+def merge_leaderboards(leaderboards: List[list], size: int) -> list:
+    entries: Dict[str, list] = {}
+    for leaderboard in leaderboards:
+        for name, session, score in leaderboard:
+            entry = entries.get(session)
+            if entry == None:
+                entries[session] = [name, session, score]
+            else:
+                entry[2] += score
+
+    return sorted(entries.values(), key=lambda entry: entry[2], reverse=True)[:size]
+
+class Tile():
+    id: int
+    name: str
+    connection: Connection
+    process: BaseProcess
+    metrics: str
+    memory_report: dict
+    world_state: list | None
+    leaderboard: list
+    overload_level: int
+    # cleared once the tile process is gone, nothing is sent to it or merged from it after that
+    alive: bool = True
+
+    def __init__(self, id: int, connection: Connection, process: BaseProcess) -> None:
+        self.id = id
+        self.name = f"tile-{id}"
+        self.connection = connection
+        self.process = process
+        self.metrics = ""
+        self.memory_report = {}
+        self.world_state = None
+        self.leaderboard = []
+        self.overload_level = 0
+
+class TileCoordinator():
+    socket: SocketServer
+    layout: TileLayout
+    tiles: List[Tile]
+    snapshot_room: str | None
+    snapshot_listeners: list
+    handoffs: int = 0
+    rejected_sessions: int = 0
+
+    # session -> tiles holding its cells, inputs only go there
+    _sessions: Dict[str, Set[int]]
+    _spawn_tile: int
+    _snapshot_interval: float
+    _leaderboard_interval: float
+    _leaderboard_size: int
+
+    def __init__(self, socket: SocketServer, config: Config) -> None:
+        context = multiprocessing.get_context("spawn")
+        server_config = config.server
+        snapshot_rate = server_config.snapshot_rate or server_config.update_rate
+
+        self.socket = socket
+        self.layout = tile_layout(config.game, server_config.tile_columns, server_config.tile_rows)
+        self.tiles = []
+        self.snapshot_room = None
+        self.snapshot_listeners = []
+
+        self._sessions = {}
+        self._spawn_tile = self.layout.tile_at(0, 0)
+        self._snapshot_interval = 1 / snapshot_rate
+        self._leaderboard_interval = (1 / server_config.leaderboard_rate) if server_config.leaderboard_rate > 0 else 0
+        self._leaderboard_size = server_config.leaderboard_size
+
+        for tile_id in range(len(self.layout)):
+            connection, tile_connection = context.Pipe()
+            process = context.Process(
+                target=run_tile,
+                args=(tile_config(config, self.layout, tile_id), tile_id, self.layout, tile_connection),
+                name=f"tile-{tile_id}",
+                daemon=True
+            )
+
+            self.tiles.append(Tile(tile_id, connection, process))
+
+    def _send(self, tile: Tile, message: tuple):
+        if not tile.alive:
+            return
+
+        try:
+            tile.connection.send(message)
+        except OSError:
+            self._drop(tile)
+
+    def _drop(self, tile: Tile):
+        if not tile.alive:
+            return
+
+        print(f"{tile.name} exited, dropping it")
+        tile.alive = False
+        tile.world_state = None
+        tile.leaderboard = []
+        tile.overload_level = 0
+        asyncio.get_running_loop().remove_reader(tile.connection.fileno())
+
+    def _forward(self, tile_id: int, event: str, sid: str, payload):
+        self._send(self.tiles[tile_id], (INPUT_MESSAGE, event, sid, payload))
+
+    # cells of sessions that left in the meantime are dropped on the way
+    def _route_handoff(self, destination: int, entries: List[tuple]) -> List[tuple]:
+        sessions = self._sessions
+
+        routed = []
+        for entry in entries:
+            sid = entry[1]
+            if sid != None:
+                session_tiles = sessions.get(sid)
+                if session_tiles == None:
+                    continue
+
+                session_tiles.add(destination)
+
+            routed.append(entry)
+
+        self.handoffs += len(routed)
+        return routed
+
+    def _relay(self, tile: Tile):
+        socket = self.socket
+        connection = tile.connection
+
+        while connection.poll():
+            try:
+                message = connection.recv()
+            except EOFError:
+                self._drop(tile)
+                return
+
+            kind = message[0]
+
+            if kind == ROUTE_MESSAGE:
+                _, destination, routed = message
+                if routed[0] == HANDOFF_MESSAGE:
+                    routed = (HANDOFF_MESSAGE, self._route_handoff(destination, routed[1]))
+
+                self._send(self.tiles[destination], routed)
+            elif kind == SNAPSHOT_MESSAGE:
+                tile.world_state = message[1]
+            elif kind == METRICS_MESSAGE:
+                tile.metrics = message[1]
+            elif kind == MEMORY_REPORT_MESSAGE:
+                tile.memory_report = message[1]
+            elif kind == OVERLOAD_MESSAGE:
+                tile.overload_level = message[1]
+            else:
+                _, event, data, to = message
+                if event == "leaderboard":
+                    tile.leaderboard = data
+                else:
+                    asyncio.ensure_future(socket.emit(event, data, to=to))
+
+    # cells wander into every tile, so one tile shedding admissions closes the whole map
+    def connect(self, sid: str, environ) -> bool:
+        if any(tile.overload_level >= SHED_ADMISSIONS for tile in self.tiles):
+            self.rejected_sessions += 1
+            return False
+
+        self._sessions[sid] = set()
+        for tile in self.tiles:
+            self._forward(tile.id, "connect", sid, None)
+
+        return True
+
+    def disconnect(self, sid: str):
+        self._sessions.pop(sid, None)
+        for tile in self.tiles:
+            self._forward(tile.id, "disconnect", sid, None)
+
+    def respawn(self, sid: str, name: str):
+        self._sessions.setdefault(sid, set()).add(self._spawn_tile)
+        self._forward(self._spawn_tile, "respawn", sid, name)
+
+    def _forward_session(self, event: str, sid: str, payload):
+        for tile_id in self._sessions.get(sid, ()):
+            self._forward(tile_id, event, sid, payload)
+
+    def move(self, sid: str, target_point: tuple[float, float]):
+        self._forward_session("move", sid, target_point)
+
+    def shoot(self, sid: str, target_point: tuple[float, float]):
+        self._forward_session("shoot", sid, target_point)
+
+    def split(self, sid: str, target_point: tuple[float, float]):
+        self._forward_session("split", sid, target_point)
+
+    # a tile that fell behind keeps contributing its last snapshot
+    async def _broadcast_snapshots(self):
+        start = time()
+        while True:
+            await asyncio.sleep(self._snapshot_interval)
+
+            world_states = [tile.world_state for tile in self.tiles if tile.world_state != None]
+            if len(world_states) == 0:
+                continue
+
+            world_state = merge_world_states(time() - start, world_states)
+            await self.socket.emit("snapshot", world_state, to=self.snapshot_room)
+            for listener in self.snapshot_listeners:
+                listener(world_state)
+
+    async def _broadcast_leaderboard(self):
+        while True:
+            await asyncio.sleep(self._leaderboard_interval)
+            entries = merge_leaderboards([tile.leaderboard for tile in self.tiles], self._leaderboard_size)
+            await self.socket.emit("leaderboard", entries)
+
+    def render_metrics(self) -> str:
+        lines = [
+            f"glob_tile_sessions {len(self._sessions)}",
+            f"glob_tile_handoffs_total {self.handoffs}",
+            f"glob_rejected_sessions_total {self.rejected_sessions}",
+        ]
+
+        for tile in self.tiles:
+            globs = len(tile.world_state[2]) if tile.world_state != None else 0
+            lines.append(f"glob_tile_globs{{tile=\"{tile.id}\"}} {globs}")
+            lines.append(f"glob_tile_alive{{tile=\"{tile.id}\"}} {int(tile.alive)}")
+            lines.extend(label_metrics(tile.metrics, f'tile="{tile.id}"'))
+
+        lines.append("")
+        return "\n".join(lines)
+
+    def memory_report(self) -> dict:
+        return {tile.name: tile.memory_report for tile in self.tiles}
+
+    async def init_game_loop(self):
+        loop = asyncio.get_running_loop()
+
+        for tile in self.tiles:
+            tile.process.start()
+            loop.add_reader(tile.connection.fileno(), self._relay, tile)
+
+        loop.create_task(self._broadcast_snapshots())
+        if self._leaderboard_interval > 0:
+            loop.create_task(self._broadcast_leaderboard())
+
+        await asyncio.gather(*[
+            loop.run_in_executor(None, tile.process.join) for tile in self.tiles
+        ])